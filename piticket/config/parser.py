@@ -46,6 +46,22 @@ DEFAULT = odict((
                  "Auto-start delay", [str(i) for i in range(0, 121, 5)])),
         ))
      ),
+    ("WINDOW",
+        odict((
+            ("text_cache_size",
+                (8,
+                 "Memory in MB used to keep the rendered texts",
+                 "Text cache size", [str(i) for i in (2, 4, 8, 16, 32)])),
+            ("image_cache_size",
+                (32,
+                 "Memory in MB used to keep the decoded images",
+                 "Image cache size", [str(i) for i in (8, 16, 32, 64, 128)])),
+            ("idle_fps",
+                (2,
+                 "Frames per second when the screen is not used (0 to wait for an event or a timer)",
+                 "Idle frame rate", [str(i) for i in (0, 1, 2, 5, 10)])),
+        ))
+     ),
 ))
 
 
@@ -1,5 +1,6 @@
 import pygame 
 import os.path as osp
+from functools import lru_cache
 from PIL import ImageFont 
 
 def get_filename(name):
@@ -17,6 +18,75 @@ def get_available_fonts():
     sys_available_fonts = pygame.font.get_available_fonts()
     return sys_available_fonts 
 
+# Size used to measure the texts before estimating the size which fits a rectangle
+REFERENCE_SIZE = 100
+
+@lru_cache(maxsize=128)
+def load_pygame_font(font_name, size):
+    """Return the pygame font object for the given size, the last loaded fonts
+    are kept in memory.
+
+    :param font_name: name of a system font
+    :type font_name: str
+    :param size: size of the font
+    :type size: int
+    """
+    return pygame.font.SysFont(font_name, size)
+
+@lru_cache(maxsize=128)
+def load_pil_font(font_name, size):
+    """Return the PIL font object for the given size, the last loaded fonts
+    are kept in memory.
+
+    :param font_name: path to font definition file
+    :type font_name: str
+    :param size: size of the font
+    :type size: int
+    """
+    return ImageFont.truetype(font_name, size)
+
+def fit_font_size(text, measure, max_width, max_height, max_size):
+    """Return the size to use for drawing the text in the given rectangle:
+    the largest size which fits plus one (0 if none fits), or ``max_size``.
+    The result is the same than a binary search over ``[0, max_size]`` but
+    the search starts from the size estimated with the text measured at
+    ``REFERENCE_SIZE`` (text metrics are almost proportional to the font
+    size), so only a few sizes are measured.
+
+    :param text: text to draw
+    :type text: str
+    :param measure: function returning the (width, height) of the text for a size
+    :type measure: callable
+    :param max_width: width of the rect to fit
+    :type max_width: int
+    :param max_height: height of the rect to fit
+    :type max_height: int
+    :param max_size: biggest size returned
+    :type max_size: int
+    """
+    def fit(size):
+        width, height = measure(size)
+        return width <= max_width and height <= max_height
+
+    width, height = measure(REFERENCE_SIZE)
+    size = int(REFERENCE_SIZE * min(max_width / max(width, 1), max_height / max(height, 1)))
+    size = min(max(size, 1), max_size)
+    while size < max_size and fit(size):
+        size += 1
+    while size > 0 and not fit(size - 1):
+        size -= 1
+    return size
+
+@lru_cache(maxsize=1024)
+def _fit_pygame_font_size(text, font_name, max_width, max_height):
+    return fit_font_size(text, lambda size: load_pygame_font(font_name, size).size(text),
+                         max_width, max_height, int(max_height * 2))
+
+@lru_cache(maxsize=1024)
+def _fit_pil_font_size(text, font_name, max_width, max_height):
+    return fit_font_size(text, lambda size: load_pil_font(font_name, size).getsize(text),
+                         max_width, max_height, int(max_height))
+
 def get_pygame_font(text, font_name, max_width, max_height):
     """Create the pygame font object which fit the text to the given rectangle.
     
@@ -29,30 +99,18 @@ def get_pygame_font(text, font_name, max_width, max_height):
     :param max_height: height of the rect to fit
     :type max_height: int
     """
-    start, end = 0, int(max_height * 2)
-    while start < end:
-        k = (start + end) // 2
-        font = pygame.font.SysFont(font_name,k)
-        font_size = font.size(text)
-        if font_size[0] > max_width or font_size[1] > max_height:
-            end = k 
-        else:
-            start = k + 1
-        del font # Run garbage collector, to avoid opening too many files
-    return pygame.font.SysFont(font_name, start)
+    return load_pygame_font(font_name, _fit_pygame_font_size(text, font_name, max_width, max_height))
 
 def get_pil_font(text, font_name, max_width, max_height):
     """Create a PIL font object which fit the text to the given rectangle.
     """
-    start, end = 0, int(max_height)
-    while start < end:
-        k = (start + end) // 2
-        font = ImageFont.truetype(font_name, k)
-        font_size = font.getsize(text)
-        if font_size[0] > max_width or font_size[1] >  max_height:
-            end = k
-        else:
-            start = k + 1
-    return ImageFont.truetype(font_name, start)
+    return load_pil_font(font_name, _fit_pil_font_size(text, font_name, max_width, max_height))
+
+def clear_cache():
+    """Forget the loaded fonts and the fitted sizes (pygame fonts are no
+    longer valid after ``pygame.quit()``).
+    """
+    for func in (load_pygame_font, load_pil_font, _fit_pygame_font_size, _fit_pil_font_size):
+        func.cache_clear()
 
 CURRENT = 'nimbussansnarrow'
\ No newline at end of file
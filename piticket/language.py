@@ -189,6 +189,18 @@ def rearrange_supported_languages():
             languages.insert(1,lang)
     return languages[:3]
 
+def get_translations(lang):
+    """Return all the texts of a language keyed by translation key.
+
+    :param lang: language code, for instance 'fr'
+    :type lang: str
+    """
+    if not getattr(PARSER, 'filename', None):
+        return dict(DEFAULT.get(lang, {}))
+    if not PARSER.has_section(lang):
+        return {}
+    return {key: PARSER.get(lang, key).strip('"') for key in PARSER.options(lang)}
+
 def get_translated_text(key):
     """Return the text corresponding to the key in the language defined in the config.
 
@@ -1,11 +1,21 @@
 import pygame
 import os
+import queue
 import os.path as osp
+from contextlib import contextmanager
+from threading import Thread
 from PIL import Image, ImageOps
 
-from piticket.utils import rename_gifs
+from piticket.utils import rename_gifs, SurfacesCache
 from piticket.pictures.sizing import new_size_keep_aspect_ratio, new_size_by_croping_ratio
 
+# Decoded images returned by get_pygame_image
+IMAGES_CACHE = SurfacesCache(32 * 1024 * 1024)
+
+# Number of surfaces converted to the display pixel format, 'deferred' counts
+# the surfaces loaded before the display was created
+CONVERSIONS = {'opaque': 0, 'alpha': 0, 'deferred': 0}
+
 def get_filename(name):
     """Return absolute path to a picture located in the current package.
 
@@ -31,6 +41,49 @@ def get_gifs(name):
         fullpath_frames.append(osp.join(_dir,frame))
     return sorted(fullpath_frames)
 
+def has_transparency(surface):
+    """Return True if at least one pixel of the surface is not opaque.
+
+    :param surface: surface to inspect
+    :type surface: pygame.Surface
+    """
+    if surface.get_colorkey() is not None:
+        return True
+    if not surface.get_flags() & pygame.SRCALPHA:
+        return False
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    try:
+        return alpha.min() < 255
+    finally:
+        # Unlock the surface
+        del alpha
+
+def to_display_format(surface, alpha=None):
+    """Return the surface converted to the pixel format of the display, so
+    that it is blitted without converting each pixel again. Nothing is done
+    if the display is not created yet.
+
+    :param surface: surface to convert
+    :type surface: pygame.Surface
+    :param alpha: keep per pixel transparency, detected from the pixels if None
+    :type alpha: bool
+    """
+    if pygame.display.get_surface() is None:
+        CONVERSIONS['deferred'] += 1
+        return surface
+    if alpha is None:
+        alpha = has_transparency(surface)
+    if alpha:
+        CONVERSIONS['alpha'] += 1
+        return surface.convert_alpha()
+    CONVERSIONS['opaque'] += 1
+    return surface.convert()
+
+def get_conversion_stats():
+    """Return the number of surfaces converted to the display format.
+    """
+    return dict(CONVERSIONS)
+
 def colorize_pil_image(pil_image,color,bg_color=None):
     if not bg_color:
         bg_color = (abs(color[0] - 255), abs(color[1] - 255), abs(color[2] - 255))
@@ -44,6 +97,9 @@ def get_pygame_image(name, size=None, antialiasing=True, hflip=False, vflip=Fals
                     crop=False, angle=0, color=(255,255,255), bg_color=None):
     """Return a pygame image. If a size is given, the image is resized
      and the aspect ratio is preserved.
+
+    The image is decoded once and kept in ``IMAGES_CACHE`` until the file is
+    modified, do not draw on the returned surface.
     
     :param name: name of an image to be turned into pygame surface
     :type name: str
@@ -69,24 +125,143 @@ def get_pygame_image(name, size=None, antialiasing=True, hflip=False, vflip=Fals
         path = name
     else:
         path = get_filename(name)
+    mtime = osp.getmtime(path) if osp.isfile(path) else None
+    key = (path, mtime, size and tuple(size), antialiasing, hflip, vflip, crop, angle,
+           color and tuple(color), bg_color and tuple(bg_color))
+    image = IMAGES_CACHE.get(key)
+    if image is None:
+        if IMAGES_LOADER.is_collecting() and (size or color):
+            IMAGES_LOADER.request(key, path, size, antialiasing, crop, color, bg_color)
+            placeholder = pygame.Surface(_get_decoded_size(path, size, crop), pygame.SRCALPHA)
+            return _transform_image(placeholder, hflip, vflip, angle)
+        image = _load_pygame_image(name, path, size, antialiasing, hflip, vflip, crop, angle, color, bg_color)
+        IMAGES_CACHE.set(key, image, SurfacesCache.sizeof(image))
+    return image
+
+def _load_pygame_image(name, path, size, antialiasing, hflip, vflip, crop, angle, color, bg_color):
     if not size and not color:
-        image = pygame.image.load(name).convert()
+        image = to_display_format(pygame.image.load(name))
+        return _transform_image(image, hflip, vflip, angle)
+    return _convert_decoded_image(_decode_image(path, size, antialiasing, crop, color, bg_color),
+                                  hflip, vflip, angle)
+
+def _decode_image(path, size, antialiasing, crop, color, bg_color):
+    # Only PIL is used here, so that it can be called from a worker thread
+    if osp.isfile(path):
+        pil_image = Image.open(path).convert('RGBA')
+    else:
+        pil_image = Image.new('RGBA', size, (0,0,0,0))
+    if color:
+        pil_image = colorize_pil_image(pil_image, color, bg_color)
+    if size:
+        if crop:
+            pil_image = pil_image.crop(new_size_by_croping_ratio(pil_image.size,size))
+        pil_image = pil_image.resize(new_size_keep_aspect_ratio(pil_image.size, size), Image.LANCZOS if antialiasing else Image.NEAREST)
+    return pil_image.tobytes(), pil_image.size, pil_image.mode, pil_image.getchannel('A').getextrema()[0] < 255
+
+def _get_decoded_size(path, size, crop):
+    # Size of the image returned by _decode_image, without decoding the pixels
+    if osp.isfile(path):
+        with Image.open(path) as pil_image:
+            image_size = pil_image.size
     else:
-        if osp.isfile(path):
-            pil_image = Image.open(path).convert('RGBA')
-        else:
-            pil_image = Image.new('RGBA', size, (0,0,0,0))
-        if color:
-            pil_image = colorize_pil_image(pil_image, color, bg_color)
-        if size:
-            if crop:
-                pil_image = pil_image.crop(new_size_by_croping_ratio(pil_image.size,size))
-            pil_image = pil_image.resize(new_size_keep_aspect_ratio(pil_image.size, size), Image.LANCZOS if antialiasing else Image.NEAREST)
-
-        image = pygame.image.frombuffer(pil_image.tobytes(), pil_image.size, pil_image.mode)
+        image_size = size
+    if not size:
+        return image_size
+    if crop:
+        x1, y1, x2, y2 = new_size_by_croping_ratio(image_size, size)
+        image_size = (x2 - x1, y2 - y1)
+    return new_size_keep_aspect_ratio(image_size, size)
 
+def _convert_decoded_image(decoded, hflip, vflip, angle):
+    data, size, mode, alpha = decoded
+    image = pygame.image.frombuffer(data, size, mode)
+    # Blit faster and release the PIL buffer
+    image = to_display_format(image, alpha=alpha)
+    return _transform_image(image, hflip, vflip, angle)
+
+def _transform_image(image, hflip, vflip, angle):
     if hflip or vflip:
         image = pygame.transform.flip(image, hflip, vflip)
     if angle != 0:
         image = pygame.transform.rotate(image, angle)
-    return image
\ No newline at end of file
+    return image
+
+
+class ImagesLoader():
+    """Decode and resize the images requested by :py:func:`get_pygame_image`
+    with PIL in a worker thread. Only the conversion of the pixels to the
+    display format is done on the main thread, by :py:meth:`convert`.
+    """
+
+    def __init__(self):
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._pending = set()
+        self._collecting = False
+        self._thread = None
+
+    @contextmanager
+    def collect(self):
+        """Within this context, :py:func:`get_pygame_image` does not decode
+        the images missing from ``IMAGES_CACHE``: they are requested to the
+        worker thread and a transparent surface of the same size is returned.
+        """
+        self._collecting = True
+        try:
+            yield self
+        finally:
+            self._collecting = False
+
+    def is_collecting(self):
+        return self._collecting
+
+    def request(self, key, *args):
+        """Decode an image in the worker thread, see :py:func:`_decode_image`
+        for the arguments.
+
+        :param key: key of the image in ``IMAGES_CACHE``
+        :type key: tuple
+        """
+        if key in self._pending:
+            return
+        self._pending.add(key)
+        if self._thread is None:
+            self._thread = Thread(target=self._threaded_decode, daemon=True)
+            self._thread.start()
+        self._requests.put((key, args))
+
+    def _threaded_decode(self):
+        while True:
+            key, args = self._requests.get()
+            try:
+                decoded = _decode_image(*args)
+            except Exception:
+                # Raised again when the image is loaded by get_pygame_image
+                decoded = None
+            self._results.put((key, decoded))
+
+    def convert(self, timeout=0):
+        """Store the next image decoded by the worker thread in
+        ``IMAGES_CACHE``, waiting at most ``timeout`` seconds for it.
+
+        :param timeout: seconds to wait for an image
+        :type timeout: float
+        :return: True while images are being decoded
+        :rtype: bool
+        """
+        if not self._pending:
+            return False
+        try:
+            key, decoded = self._results.get(timeout=timeout)
+        except queue.Empty:
+            return True
+        self._pending.discard(key)
+        if decoded is not None:
+            hflip, vflip, angle = key[4], key[5], key[7]
+            image = _convert_decoded_image(decoded, hflip, vflip, angle)
+            IMAGES_CACHE.set(key, image, SurfacesCache.sizeof(image))
+        return bool(self._pending)
+
+
+IMAGES_LOADER = ImagesLoader()
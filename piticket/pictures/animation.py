@@ -0,0 +1,102 @@
+import time
+import pygame
+from PIL import Image
+
+from piticket.utils import LOGGER
+from piticket.pictures import get_gifs, to_display_format
+from piticket.pictures.sizing import new_size_keep_aspect_ratio
+
+# Animations already loaded, shared by all the boxes displaying them
+ANIMATIONS = {}
+
+def get_animation(name, size, fps=25):
+    """Return the animation built from the frames of a gif, see :py:func:`get_gifs`.
+    The frames are loaded only the first time.
+
+    :param name: the name of the gif
+    :type name: str
+    :param size: maximum size of a frame, the aspect ratio is preserved
+    :type size: tuple
+    :param fps: number of frames displayed per second
+    :type fps: int
+    """
+    key = (name, tuple(size), fps)
+    if key not in ANIMATIONS:
+        ANIMATIONS[key] = Animation(get_gifs(name), size, fps)
+    return ANIMATIONS[key]
+
+
+class Animation():
+    """Frames of an animation resized once and packed side by side in a single
+    surface (sprite sheet). The frame to display only depends on the time.
+    """
+
+    def __init__(self, frames, size, fps=25):
+        """
+        :param frames: paths of the frames pictures
+        :type frames: list
+        :param size: maximum size of a frame, the aspect ratio is preserved
+        :type size: tuple
+        :param fps: number of frames displayed per second
+        :type fps: int
+        """
+        if not frames:
+            raise ValueError("An animation needs at least one frame")
+        self.fps = fps
+        images = []
+        for frame in frames:
+            image = Image.open(frame).convert('RGBA')
+            images.append(image.resize(new_size_keep_aspect_ratio(image.size, size), Image.LANCZOS))
+
+        width = max(image.width for image in images)
+        height = max(image.height for image in images)
+        sheet = Image.new('RGBA', (width * len(images), height), (0, 0, 0, 0))
+        self.frames_rects = []
+        for i, image in enumerate(images):
+            # Center each frame in its cell
+            x = i * width + (width - image.width) // 2
+            y = (height - image.height) // 2
+            sheet.paste(image, (x, y))
+            self.frames_rects.append(pygame.Rect(i * width, 0, width, height))
+
+        self.sheet = pygame.image.frombuffer(sheet.tobytes(), sheet.size, sheet.mode)
+        # The cells around the frames are transparent
+        self.sheet = to_display_format(self.sheet, alpha=True)
+        LOGGER.debug("Animation of %s frames loaded in a %sx%s sprite sheet", len(images), *sheet.size)
+
+    def __len__(self):
+        return len(self.frames_rects)
+
+    def get_rect(self):
+        """Return the rect of one frame.
+        """
+        return pygame.Rect((0, 0), self.frames_rects[0].size)
+
+    def get_frame_index(self, elapsed):
+        """Return the index of the frame to display.
+
+        :param elapsed: seconds since the beginning of the animation
+        :type elapsed: float
+        """
+        return int(elapsed * self.fps) % len(self.frames_rects)
+
+    def get_next_frame_time(self, start_time=0):
+        """Return the time when the next frame has to be displayed.
+
+        :param start_time: time when the animation started
+        :type start_time: float
+        """
+        return start_time + (int((time.time() - start_time) * self.fps) + 1) / self.fps
+
+    def draw(self, screen, pos, start_time=0):
+        """Draw the current frame of the animation.
+
+        :param screen: surface to draw on
+        :type screen: pygame.Surface
+        :param pos: top-left position of the frame
+        :type pos: tuple
+        :param start_time: time when the animation started
+        :type start_time: float
+        """
+        index = self.get_frame_index(time.time() - start_time)
+        screen.blit(self.sheet, pos, self.frames_rects[index])
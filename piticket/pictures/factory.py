@@ -1,5 +1,6 @@
 import zlib 
 import base64
+import pygame
 from PIL import Image, ImageDraw
 from io import BytesIO
 from xml.etree import ElementTree
@@ -7,6 +8,8 @@ from urllib.parse import unquote
 from piticket import fonts
 from piticket.utils import LOGGER 
 from piticket.views.box import Box
+from piticket.pictures import to_display_format
+from piticket.pictures.sizing import new_size_keep_aspect_ratio
 
 
 def get_ticket_factory(filename, ticket):
@@ -214,6 +217,7 @@ class TicketFactory:
         self.ticket = ticket
         size = self.template.get_size()
         self.image = self._build_ticket(Image.new('RGBA',size,(255,0,0,0)))
+        self._previews = {}
         
     def _image_paste(self, image, dest_image, pos_x, pos_y, angle=None):
         """Paste an image onto another one with the given rotation angle.
@@ -274,4 +278,21 @@ class TicketFactory:
         return image
      
     def save(self, ticket_file):
-        self.image.save(ticket_file)
\ No newline at end of file
+        self.image.save(ticket_file)
+
+    def get_preview(self, size):
+        """Return the ticket as a pygame surface fitting in the given size,
+        built from the image in memory. The aspect ratio is preserved.
+
+        :param size: maximum size of the preview
+        :type size: tuple
+        """
+        size = tuple(size)
+        if size not in self._previews:
+            # The image is first reduced by an integer factor, which is much
+            # faster than a LANCZOS filter over the full resolution image
+            image = self.image.resize(new_size_keep_aspect_ratio(self.image.size, size),
+                                      Image.LANCZOS, reducing_gap=2.0)
+            surface = pygame.image.frombuffer(image.tobytes(), image.size, image.mode)
+            self._previews[size] = to_display_format(surface, alpha=image.getchannel('A').getextrema()[0] < 255)
+        return self._previews[size]
\ No newline at end of file
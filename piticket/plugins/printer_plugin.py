@@ -38,6 +38,8 @@ class PrinterPlugin:
                                     )
         
         factory.save(app.ticket_file.name)
+        # Kept to display the ticket without reading the file again
+        app.ticket_factory = factory
     
     @hookimpl(hookwrapper=True)
     def piticket_setup_ticket_factory(self, factory):
@@ -64,4 +66,5 @@ class PrinterPlugin:
         # Delete file and reset the variable 
         app.ticket_file.close()
         os.unlink(app.ticket_file.name)
-        app.ticket_file = None
\ No newline at end of file
+        app.ticket_file = None
+        app.ticket_factory = None
\ No newline at end of file
@@ -17,11 +17,24 @@ class ViewPlugin():
         self.process_view_timer = PoolingTimer(5)
         # Default time for pop up box
         self.timeout = 10
+        # Ends when the pop up box asking to continue has to be shown, the
+        # scheduler computes a frame at that time even if nothing happens
+        self.popup_timer = PoolingTimer(self.screen_lock_timer.timeout - self.timeout)
         # self.modified_ticket=None
 
+    def _start_screen_lock(self):
+        self.screen_lock_timer.start()
+        self.popup_timer.start()
+
+    def _show_screen_lock_popup(self, state_name, app, win, events):
+        if self.popup_timer.is_timeout() and not events:
+            win.show_popup_box(state_name, self.timeout, app)
+
     @hookimpl 
     def state_wait_enter(self,cfg,app,win):
         win.drop_cache()
+        # Next backgrounds are built while the intro is displayed
+        win.prebuild('choose', app.ticket_choices)
 
     @hookimpl 
     def state_wait_do(self,cfg,app,win):
@@ -32,21 +45,30 @@ class ViewPlugin():
         change_event = app.find_event(events)
         if change_event:
             return 'choose'
+
+    @hookimpl
+    def state_wait_exit(self,cfg,app,win):
+        # The video is decoded again at the next intro
+        win.stop_intro()
         
     @hookimpl
     def state_choose_enter(self,cfg,app,win):
         """"""
-        self.screen_lock_timer.start()
+        self._start_screen_lock()
+        win.prebuild('translate')
 
     @hookimpl 
     def state_choose_do(self,cfg,app,win,events):
         """"""
         win.show_choice(events, tickets=app.ticket_choices)
+        # The pointed ticket is likely to be chosen
+        pointed = win.get_pointed_choice()
+        if pointed:
+            win.prebuild('chosen', pointed)
         if events:
             # Reset timer if cursor is active
-            self.screen_lock_timer.start()
-        if int(self.screen_lock_timer.remaining())==self.timeout and not events:
-            win.show_popup_box('choose',self.timeout,app)
+            self._start_screen_lock()
+        self._show_screen_lock_popup('choose', app, win, events)
         
     @hookimpl
     def state_choose_validate(self,cfg,app,win,events):
@@ -55,6 +77,8 @@ class ViewPlugin():
         if change_event:
             if change_event.state == 'chosen':
                 app.chosen_ticket = change_event.choice
+                # A new selection always starts from the ticket default values
+                win.drop_cache('chosen')
             # Return to either choose, wait, translate, or chosen
             return change_event.state
         if self.screen_lock_timer.is_timeout():
@@ -67,7 +91,8 @@ class ViewPlugin():
     @hookimpl 
     def state_chosen_enter(self,cfg,app,win):
         """"""
-        self.screen_lock_timer.start()
+        self._start_screen_lock()
+        win.prebuild('process')
 
     @hookimpl 
     def state_chosen_do(self,cfg,app,win,events):
@@ -75,9 +100,8 @@ class ViewPlugin():
         win.show_choice(events,selected=app.chosen_ticket)
         if events:
             # Reset timer if cursor is active
-            self.screen_lock_timer.start()
-        if int(self.screen_lock_timer.remaining())==self.timeout and not events:
-            win.show_popup_box('chosen',self.timeout,app)
+            self._start_screen_lock()
+        self._show_screen_lock_popup('chosen', app, win, events)
 
     @hookimpl 
     def state_chosen_validate(self,cfg,app,win,events):
@@ -116,7 +140,6 @@ class ViewPlugin():
     @hookimpl 
     def state_translate_exit(self,cfg,app,win):
         """"""
-        win.drop_cache()
 
 
     @hookimpl
@@ -163,19 +186,20 @@ class ViewPlugin():
             return 'pay'
             
     @hookimpl 
-    def state_pay_enter(self,app):
-        self.screen_lock_timer.start()
+    def state_pay_enter(self,app,win):
+        self._start_screen_lock()
+        win.prebuild('successful')
+        win.prebuild('unsuccessful')
 
     @hookimpl 
     def state_pay_do(self,cfg,app,win,events):
         """"""
-        win.show_pay(events, app.ticket_file.name, app.modified_ticket)
+        win.show_pay(events, app.ticket_factory, app.modified_ticket)
         event = app.process_payment(events)
         if event and event.status=='processing':
             win.show_popup_processing_box('process')
 
-        if int(self.screen_lock_timer.remaining())==self.timeout and not events:
-            win.show_popup_box('pay',self.timeout,app)
+        self._show_screen_lock_popup('pay', app, win, events)
 
     @hookimpl
     def state_pay_validate(self,cfg,app,win,events):
@@ -201,11 +225,13 @@ class ViewPlugin():
         """"""
         self.process_view_timer.start()
         win.show_payment_status(successful=app.payment_status)
+        if app.payment_status:
+            win.prebuild('print')
 
     @hookimpl
     def state_payment_process_do(self,cfg,app,win):
         """"""
-        # Called here to keep updating time
+        # Only the clock of the header is painted again, when its second changes
         win.show_payment_status(successful=app.payment_status)
 
     @hookimpl
@@ -221,6 +247,7 @@ class ViewPlugin():
         """"""
         self.print_view_timer.start()
         win.show_printing()
+        win.prebuild('finish')
 
     @hookimpl 
     def state_print_do(self,win):
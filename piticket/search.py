@@ -0,0 +1,191 @@
+import unicodedata
+
+from piticket.utils import LOGGER
+from piticket import language
+
+
+def fold(text):
+    """Return the text in lower case, without accents and with single spaces,
+    so that 'Abéokuta' and 'ABEOKUTA ' are searched the same way.
+
+    :param text: text to fold
+    :type text: str
+    """
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.casefold().split())
+
+
+class TrieNode():
+    """Node of the prefix tree, it knows all the entries of its branch.
+    """
+    __slots__ = ('children', 'ids')
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()
+
+
+class DestinationIndex():
+    """Prefix tree over the destinations of the fare catalogue.
+
+    Each destination is indexed by its name, by every word of its name and by
+    its aliases (station codes, names in the supported languages). A node
+    holds the sorted entries of its whole branch, so a lookup only walks the
+    characters of the query.
+    """
+
+    def __init__(self, catalogue, aliases=None):
+        """
+        :param catalogue: fares keyed by (destination, price, ticket_type)
+        :type catalogue: dict
+        :param aliases: other names of the destinations, for instance the
+                        station codes, keyed by destination
+        :type aliases: dict
+        """
+        aliases = aliases or {}
+        # Entries are sorted by destination, then price
+        self.keys = sorted(catalogue, key=lambda key: (fold(key[0]), key[1:]))
+        self.root = TrieNode()
+        for index, key in enumerate(self.keys):
+            destination = key[0]
+            names = [destination] + list(aliases.get(destination, ()))
+            names.extend(self.get_local_names(destination))
+            for name in names:
+                self.add(name, index)
+        self._freeze(self.root)
+        LOGGER.debug("Destinations index built with %s entries", len(self.keys))
+
+    @staticmethod
+    def get_local_names(destination):
+        """Return the names of the destination defined in the translation file.
+        """
+        names = []
+        if getattr(language.PARSER, 'filename', None):
+            key = destination.lower()
+            for lang in language.get_supported_languages():
+                if language.PARSER.has_option(lang, key):
+                    names.append(language.PARSER.get(lang, key).strip('"'))
+        return names
+
+    def add(self, name, index):
+        """Index the entry under the name and under each word of the name.
+
+        :param name: name of the destination or alias
+        :type name: str
+        :param index: index of the entry in :py:attr:`keys`
+        :type index: int
+        """
+        name = fold(name)
+        words = name.split(' ')
+        for i in range(len(words)):
+            node = self.root
+            node.ids.add(index)
+            for char in ' '.join(words[i:]):
+                node = node.children.setdefault(char, TrieNode())
+                node.ids.add(index)
+
+    def _freeze(self, root):
+        # Sorted tuples are smaller than sets and keep the catalogue order
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            node.ids = tuple(sorted(node.ids))
+            stack.extend(node.children.values())
+
+    def find_node(self, query, node=None):
+        """Return the node reached by the query, None if nothing matches.
+
+        :param query: folded text to search
+        :type query: str
+        :param node: node from which the query is searched, the root by default
+        :type node: :py:class:`TrieNode`
+        """
+        node = node or self.root
+        for char in query:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def search(self, query, limit=None):
+        """Return the keys of the catalogue matching the query.
+
+        :param query: beginning of the destination name, of one of its words
+                      or of one of its aliases
+        :type query: str
+        :param limit: maximum number of keys returned
+        :type limit: int
+        """
+        node = self.find_node(fold(query))
+        if node is None:
+            return []
+        return [self.keys[index] for index in node.ids[:limit]]
+
+    def typeahead(self):
+        """Return a new :py:class:`Typeahead` on this index.
+        """
+        return Typeahead(self)
+
+
+class Typeahead():
+    """Incremental search: each typed character refines the previous result
+    by moving down one node of the prefix tree.
+    """
+
+    def __init__(self, index):
+        """
+        :param index: index to search in
+        :type index: :py:class:`DestinationIndex`
+        """
+        self.index = index
+        self.text = ''
+        # Nodes reached by each character, None once nothing matches
+        self._nodes = [index.root]
+
+    def _push(self, char):
+        node = self._nodes[-1]
+        if node is not None:
+            node = node.children.get(char)
+        self._nodes.append(node)
+
+    def type(self, text):
+        """Add characters at the end of the query.
+
+        :param text: typed characters
+        :type text: str
+        """
+        for char in text:
+            self.text += char
+            folded = fold(self.text)
+            # Accents and repeated spaces may not produce a new character
+            while len(folded) + 1 > len(self._nodes):
+                self._push(folded[len(self._nodes) - 1])
+            while len(folded) + 1 < len(self._nodes):
+                self._nodes.pop()
+
+    def erase(self, count=1):
+        """Remove characters at the end of the query.
+
+        :param count: number of characters to remove
+        :type count: int
+        """
+        self.text = self.text[:max(len(self.text) - count, 0)]
+        del self._nodes[len(fold(self.text)) + 1:]
+
+    def clear(self):
+        """Start a new query.
+        """
+        self.text = ''
+        self._nodes = [self.index.root]
+
+    def results(self, limit=None):
+        """Return the keys of the catalogue matching the current query.
+
+        :param limit: maximum number of keys returned
+        :type limit: int
+        """
+        node = self._nodes[-1]
+        if node is None:
+            return []
+        return [self.index.keys[index] for index in node.ids[:limit]]
@@ -1,5 +1,5 @@
 import time 
-from piticket.utils import BlockConsoleHandler, LOGGER 
+from piticket.utils import BlockConsoleHandler, LOGGER, SCHEDULER
 
 class StatesMachine():
     def __init__(self, plugin_manager, configuration, app, window):
@@ -76,6 +76,8 @@ class StatesMachine():
         self._start_time = time.time()
         LOGGER.debug("Active state '%s", state_name)
         self.active_state = state_name 
+        # Show the new state without waiting for the idle period
+        SCHEDULER.request_frame()
 
         try:
             hook = getattr(self.pm.hook, f'state_{self.active_state}_enter')
@@ -19,6 +19,8 @@ from piticket.views import PiWindow
 from piticket.states import StatesMachine
 from piticket.config import PiConfigParser
 from piticket.plugins import create_plugin_manager
+from piticket.pictures import IMAGES_CACHE, get_conversion_stats
+from piticket.pictures.animation import get_animation
 from piticket.printer import Printer
 from piticket.smartcard import SmartCard
 from piticket.payment_terminal import PaymentTerminal, PAYMENT_STATUS_EVENT
@@ -38,6 +40,10 @@ travels = {('Nasarawa','10000','Standard off-peak day return'):{'name':'','depar
 class PiApplication():
     def __init__(self, plugin_manager,config):
         self.win = PiWindow('Piticket')
+        TEXT_CACHE.resize(config.getint('WINDOW', 'text_cache_size') * 1024 * 1024)
+        IMAGES_CACHE.resize(config.getint('WINDOW', 'image_cache_size') * 1024 * 1024)
+        SCHEDULER.idle_fps = config.getint('WINDOW', 'idle_fps')
+        SCHEDULER.add_source(self.win.get_next_update)
         self._pm = plugin_manager
 
         self.chosen_ticket = None
@@ -52,6 +58,7 @@ class PiApplication():
 
         self.ticket_template = 'nrc_trainticket.xml'
         self.ticket_file = None
+        self.ticket_factory = None
 
         self.printer = Printer()
         if self.printer.is_connected():
@@ -78,7 +85,8 @@ class PiApplication():
         self.states_machine.add_state('finish')
 
     def _initialize(self):
-        pass 
+        # Load the animation of the processing pop up box before it is shown
+        get_animation('Spinner_transparent', (150, 150))
 
     def post_event(self, state_name):
         """Place an event in the event list.
@@ -87,34 +95,34 @@ class PiApplication():
 
 
     def find_quit_event(self, events):
-        for event in events:
-            if event.type == pygame.QUIT:
-                return event 
-        return 
+        return FrameInput.of(events).first(pygame.QUIT)
+
+    def find_resize_event(self, events):
+        return FrameInput.of(events).first(pygame.VIDEORESIZE)
+
+    def find_fullscreen_event(self, events):
+        for event in FrameInput.of(events).get(pygame.KEYDOWN):
+            if event.key == pygame.K_f and pygame.key.get_mods() & pygame.KMOD_CTRL:
+                return event
 
     def find_event(self, events):
-        for event in events:
-            if event.type == pygame.MOUSEBUTTONUP:
-                return event 
-        return 
+        return FrameInput.of(events).first(pygame.MOUSEBUTTONUP)
     
     def find_change_event(self, events):
-        for event in events:
-            if (event.type == pygame.MOUSEBUTTONUP or event.type == pygame.FINGERUP) and hasattr(event, 'state'):
+        for event in FrameInput.of(events).get(pygame.MOUSEBUTTONUP, pygame.FINGERUP):
+            if hasattr(event, 'state'):
                 return event
         return 
 
     def process_payment(self, events):
         """Listen to the payment terminal
         """
-        for event in events:
-            if event.type == PAYMENT_STATUS_EVENT:
-                return event
+        return FrameInput.of(events).first(PAYMENT_STATUS_EVENT)
         
     def main_loop(self):
         try:
-            clk = pygame.time.Clock()
-            fps = 40
+            # Ensure the program will never run more than 40 frames per second
+            SCHEDULER.fps = 40
             self._initialize()
             self.states_machine.set_state('wait')
             self.active_state = 'wait'
@@ -122,22 +130,32 @@ class PiApplication():
             start = True
 
             while start:
-                # Get events list 
-                events = pygame.event.get()
+                # Wait for the next frame and get events list, the motion
+                # events are merged and the events are grouped by type once
+                events = FrameInput(SCHEDULER.wait())
 
                 if self.find_quit_event(events):
                     start = False
+
+                # The backgrounds are only laid out again when the window is resized
+                event = self.find_resize_event(events)
+                if event:
+                    self.win.resize(event.size)
+                if self.find_fullscreen_event(events):
+                    self.win.toggle_fullscreen()
                         
                 # Move between states
                 self.states_machine.process(events)
 
-                pygame.display.update()
-                clk.tick(fps) # Ensure the program will never run more than 40 frames per second
+                # Send only the modified areas of the window to the screen
+                self.win.update_display()
             
         except Exception as ex:
             LOGGER.error(str(ex), exc_info=True)
             LOGGER.error(get_crash_message())
         finally:
+            LOGGER.debug("Images cache: %s", IMAGES_CACHE.get_stats())
+            LOGGER.debug("Surfaces converted to the display format: %s", get_conversion_stats())
             pygame.quit()
             self._pm.hook.piticket_cleanup(app=self)
 
@@ -1,11 +1,16 @@
 import os
 import sys 
+import math
 import time
+import heapq
 import logging
+import weakref
 import platform
 
 
+import pygame
 import os.path as osp
+from collections import OrderedDict
 from piticket.fonts import get_pygame_font
 from piticket import project_name
 
@@ -19,6 +24,8 @@ class PoolingTimer():
         self.time = None 
         self._paused_total = 0
         self._paused_time = None 
+        # The frames are computed when the timer ends even if nothing happens
+        SCHEDULER.add_timer(self)
         if start:
             self.start()
     
@@ -87,6 +94,276 @@ class PoolingTimer():
             raise RuntimeError("PoolingTimer has never been started")
         return elapsed > self.timeout
 
+    def deadline(self):
+        """Return the time when the timer ends, None if it is not running.
+        """
+        if self.time is None or self._paused_time:
+            return None
+        return self.time + self.timeout + self._paused_total
+
+
+class FrameScheduler():
+    """Choose when the next frame of the main loop is computed.
+
+    The frames are computed at full rate while the screen is used or something
+    is animated. Otherwise the loop sleeps until an event is received, a
+    deadline is reached (end of a timer, widget to refresh) or the idle period
+    is elapsed.
+    """
+
+    # Events showing that someone is using the screen
+    INPUT_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION,
+                    pygame.MOUSEWHEEL, pygame.FINGERDOWN, pygame.FINGERUP,
+                    pygame.FINGERMOTION, pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT)
+
+    # Seconds kept free before the next frame when running idle tasks
+    IDLE_MARGIN = 0.01
+
+    def __init__(self, fps=40, idle_fps=2, active_time=2):
+        """
+        :param fps: maximum number of frames per second
+        :type fps: int
+        :param idle_fps: number of frames per second when nothing happens,
+                         0 to wait for an event or a deadline
+        :type idle_fps: int
+        :param active_time: seconds at full rate after the last input event
+        :type active_time: float
+        """
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.active_time = active_time
+        self._timers = weakref.WeakSet()
+        self._sources = []
+        self._idle_tasks = []
+        self._deadlines = []
+        self._active_until = 0
+        self._last_frame = 0
+        self.frames = 0
+        self.idle_frames = 0
+
+    def add_timer(self, timer):
+        """Compute a frame when the timer ends.
+
+        :param timer: timer to follow
+        :type timer: :py:class:`PoolingTimer`
+        """
+        self._timers.add(timer)
+
+    def add_source(self, func):
+        """Register a function returning the time of the next frame it
+        needs, or None if it does not need any.
+
+        :param func: function called before waiting for the next frame
+        :type func: callable
+        """
+        if func not in self._sources:
+            self._sources.append(func)
+
+    def remove_source(self, func):
+        """Forget a function registered with :py:meth:`add_source`.
+        """
+        if func in self._sources:
+            self._sources.remove(func)
+
+    def add_idle_task(self, func):
+        """Register a function doing a small piece of work each time it is
+        called, when the loop has nothing else to do. It returns True while
+        there is work left.
+
+        :param func: function called while waiting for the next frame
+        :type func: callable
+        """
+        if func not in self._idle_tasks:
+            self._idle_tasks.append(func)
+
+    def _run_idle_tasks(self, next_time):
+        # Stop as soon as an event is received or the next frame is close
+        for func in self._idle_tasks:
+            while next_time is None or time.time() + self.IDLE_MARGIN < next_time:
+                if pygame.event.peek() or not func():
+                    break
+
+    def wake_at(self, deadline):
+        """Compute a frame at the given time.
+
+        :param deadline: time in seconds since the epoch
+        :type deadline: float
+        """
+        heapq.heappush(self._deadlines, deadline)
+
+    def request_frame(self):
+        """Compute the next frame as soon as possible.
+        """
+        self.wake_at(0)
+
+    def is_active(self):
+        """Return True if the frames are computed at full rate.
+        """
+        return time.time() < self._active_until
+
+    def get_next_frame_time(self):
+        """Return the time of the next frame, None if the loop can wait
+        until an event is received.
+        """
+        min_time = self._last_frame + 1.0 / self.fps
+        if self.is_active():
+            return min_time
+        deadlines = []
+        if self.idle_fps:
+            deadlines.append(self._last_frame + 1.0 / self.idle_fps)
+        if self._deadlines:
+            deadlines.append(self._deadlines[0])
+        for timer in list(self._timers):
+            deadline = timer.deadline()
+            if deadline is not None and deadline > self._last_frame:
+                deadlines.append(deadline)
+        for func in self._sources:
+            deadline = func()
+            if deadline is not None:
+                deadlines.append(deadline)
+        if not deadlines:
+            return None
+        return max(min(deadlines), min_time)
+
+    def wait(self):
+        """Wait until the next frame has to be computed.
+
+        :return: events received meanwhile
+        :rtype: list
+        """
+        events = pygame.event.get()
+        if not events:
+            next_time = self.get_next_frame_time()
+            if self._idle_tasks:
+                # Also between the frames computed at full rate
+                self._run_idle_tasks(next_time)
+                events = pygame.event.get()
+        if not events:
+            if next_time is None:
+                events = [pygame.event.wait()]
+            else:
+                timeout = int(math.ceil((next_time - time.time()) * 1000))
+                if timeout > 0:
+                    event = pygame.event.wait(timeout)
+                    if event.type != pygame.NOEVENT:
+                        events = [event]
+            if events:
+                events.extend(pygame.event.get())
+
+        # Never compute more than fps frames per second
+        delay = self._last_frame + 1.0 / self.fps - time.time()
+        if delay > 0:
+            pygame.time.wait(int(math.ceil(delay * 1000)))
+            events.extend(pygame.event.get())
+
+        now = time.time()
+        if any(event.type in self.INPUT_EVENTS for event in events):
+            self._active_until = now + self.active_time
+        elif not self.is_active():
+            self.idle_frames += 1
+        while self._deadlines and self._deadlines[0] <= now:
+            heapq.heappop(self._deadlines)
+        self._last_frame = now
+        self.frames += 1
+        return events
+
+    def get_stats(self):
+        """Return the number of frames computed and the number of them
+        computed while nothing happened.
+        """
+        return {'frames': self.frames, 'idle_frames': self.idle_frames}
+
+
+SCHEDULER = FrameScheduler()
+
+
+class FrameInput(list):
+    """Events of a frame, with the consecutive motion events merged into
+    the latest one and the events grouped by type in a single pass.
+
+    It is a list of the events in the order they have been received, which
+    must not be modified.
+    """
+
+    MOTION_EVENTS = (pygame.MOUSEMOTION, pygame.FINGERMOTION)
+
+    def __init__(self, events=()):
+        """
+        :param events: events received since the previous frame
+        :type events: list
+        """
+        events = list(events)
+        list.__init__(self, self.coalesce(events))
+        # Number of motion events merged with the following ones
+        self.merged = len(events) - len(self)
+        self._types = {}
+        # Events having a position, in the order they have been received
+        self.pointer = []
+        for event in self:
+            self._types.setdefault(event.type, []).append(event)
+            if hasattr(event, 'pos'):
+                self.pointer.append(event)
+
+    @classmethod
+    def of(cls, events):
+        """Return the events as a :py:class:`FrameInput`, without processing
+        them again if they already are.
+        """
+        return events if isinstance(events, cls) else cls(events or [])
+
+    @classmethod
+    def coalesce(cls, events):
+        """Return the events where the motion events following each other
+        are replaced by a single event at the latest position.
+
+        :param events: events to process
+        :type events: list
+        """
+        result = []
+        run = []
+        for event in events:
+            if run and (event.type != run[0].type
+                        or getattr(event, 'finger_id', None) != getattr(run[0], 'finger_id', None)):
+                result.append(cls._merge(run))
+                run = []
+            if event.type in cls.MOTION_EVENTS:
+                run.append(event)
+            else:
+                result.append(event)
+        if run:
+            result.append(cls._merge(run))
+        return result
+
+    @staticmethod
+    def _merge(run):
+        last = run[-1]
+        if len(run) == 1:
+            return last
+        if last.type == pygame.MOUSEMOTION:
+            return pygame.event.Event(last.type, dict(last.dict, rel=(sum(event.rel[0] for event in run),
+                                                                      sum(event.rel[1] for event in run))))
+        return pygame.event.Event(last.type, dict(last.dict, dx=sum(event.dx for event in run),
+                                                  dy=sum(event.dy for event in run)))
+
+    def get(self, *types):
+        """Return the events of the given types, grouped by type.
+        """
+        if len(types) == 1:
+            return self._types.get(types[0], [])
+        return [event for event_type in types for event in self._types.get(event_type, [])]
+
+    def first(self, *types):
+        """Return the first event of the given types, None if there is none.
+        """
+        events = self.get(*types)
+        return events[0] if events else None
+
+    def has(self, *types):
+        """Return True if there is at least one event of the given types.
+        """
+        return any(event_type in self._types for event_type in types)
+
+
 class BlockConsoleHandler(logging.StreamHandler):
 
     default_level = logging.INFO
@@ -201,7 +478,137 @@ def rename_gifs(fullpath_frames):
             os.rename(frame,osp.join(head,f'frame_{name}.png'))
 
 
-def multiline_text_to_surfaces(text, color, rect, align='center'):
+class SurfacesCache():
+    """Least recently used cache of pygame surfaces. The least recently used
+    entries are dropped when the memory taken by the surfaces exceeds the
+    budget. Pinned entries are counted in the budget but never dropped, until
+    they are unpinned.
+    """
+    def __init__(self, max_bytes):
+        """
+        :param max_bytes: memory budget in bytes
+        :type max_bytes: int
+        """
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.pinned_bytes = 0
+        self._entries = OrderedDict()
+        self._pinned = {}
+
+    def __len__(self):
+        return len(self._entries) + len(self._pinned)
+
+    def __contains__(self, key):
+        return key in self._entries or key in self._pinned
+
+    @staticmethod
+    def sizeof(*surfaces):
+        """Return the memory taken by the pixels of the given surfaces.
+        """
+        return sum(surface.get_pitch() * surface.get_height() for surface in surfaces)
+
+    def get(self, key):
+        """Return the value registered with the key or None.
+        """
+        entry = self._pinned.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry[0]
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key, value, nbytes, pinned=False):
+        """Register a value, drop the least recently used ones if the budget
+        is exceeded.
+
+        :param key: hashable key
+        :type key: tuple
+        :param value: surface or any object holding surfaces
+        :type value: object
+        :param nbytes: memory taken by the value
+        :type nbytes: int
+        :param pinned: keep the value until the cache is cleared
+        :type pinned: bool
+        """
+        if key in self._entries:
+            self.bytes -= self._entries.pop(key)[1]
+        if key in self._pinned:
+            self.pinned_bytes -= self._pinned.pop(key)[1]
+        if pinned:
+            self._pinned[key] = (value, nbytes)
+            self.pinned_bytes += nbytes
+        else:
+            self._entries[key] = (value, nbytes)
+            self.bytes += nbytes
+        self.resize(self.max_bytes)
+
+    def pin(self, key):
+        """Keep an entry until it is unpinned or the cache is cleared.
+
+        :return: False if there is no entry for this key
+        :rtype: bool
+        """
+        if key in self._pinned:
+            return True
+        if key not in self._entries:
+            return False
+        value, nbytes = self._entries[key]
+        self.set(key, value, nbytes, pinned=True)
+        return True
+
+    def unpin(self, key):
+        """Let an entry be dropped again, it becomes the most recently used.
+
+        :return: False if there is no pinned entry for this key
+        :rtype: bool
+        """
+        if key not in self._pinned:
+            return False
+        value, nbytes = self._pinned[key]
+        self.set(key, value, nbytes)
+        return True
+
+    def resize(self, max_bytes):
+        """Change the memory budget, drop the least recently used entries
+        until it is respected. The pinned entries are kept even if they
+        exceed the budget on their own.
+        """
+        self.max_bytes = max_bytes
+        while self.bytes + self.pinned_bytes > self.max_bytes and self._entries:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.bytes -= nbytes
+
+    def clear(self):
+        """Drop all entries, including the pinned ones.
+        """
+        self._entries.clear()
+        self._pinned.clear()
+        self.bytes = 0
+        self.pinned_bytes = 0
+
+    def get_stats(self):
+        """Return a dictionary with entries count, memory taken and hit/miss
+        counters.
+        """
+        return {'entries': len(self._entries), 'bytes': self.bytes, 'max_bytes': self.max_bytes,
+                'pinned': len(self._pinned), 'pinned_bytes': self.pinned_bytes,
+                'hits': self.hits, 'misses': self.misses}
+
+
+# Text surfaces rendered by multiline_text_to_surfaces
+TEXT_CACHE = SurfacesCache(8 * 1024 * 1024)
+# Functions called with the arguments of each text rendered (not found in
+# the cache) by multiline_text_to_surfaces
+TEXT_LISTENERS = []
+
+def multiline_text_to_surfaces(text, color, rect, align='center', font_name='nimbussansnarrow'):
     """Return a list of text surfaces(pygame.Surface) and corresponding positions
     The ``align```parameter can be one of:
         * top-left
@@ -213,12 +620,45 @@ def multiline_text_to_surfaces(text, color, rect, align='center'):
         * bottom-left
         * bottom-center
         * bottom-right
+
+    The surfaces are rendered once and kept in ``TEXT_CACHE``, do not draw on them.
+    """
+    key = (text, tuple(color), rect.size, align, font_name)
+    lines = TEXT_CACHE.get(key)
+    if lines is None:
+        lines = _render_multiline_text(text, color, pygame.Rect((0, 0), rect.size), align, font_name)
+        TEXT_CACHE.set(key, lines, SurfacesCache.sizeof(*(surface for surface, _ in lines)))
+        for func in TEXT_LISTENERS:
+            func(text, color, rect.size, align, font_name)
+    return [(surface, pos.move(rect.x, rect.y)) for surface, pos in lines]
+
+def prerender_multiline_text(text, color, size, align='center', font_name='nimbussansnarrow', pinned=False):
+    """Render a text in ``TEXT_CACHE`` before it is displayed, see
+    :py:func:`multiline_text_to_surfaces`.
+
+    :param size: size of the rect in which the text is displayed
+    :type size: tuple
+    :param pinned: do not drop the text surfaces from the cache until they
+                   are unpinned
+    :type pinned: bool
+    :return: key of the text surfaces in ``TEXT_CACHE``
+    :rtype: tuple
     """
+    key = (text, tuple(color), tuple(size), align, font_name)
+    if key in TEXT_CACHE:
+        if pinned:
+            TEXT_CACHE.pin(key)
+        return key
+    lines = _render_multiline_text(text, color, pygame.Rect((0, 0), size), align, font_name)
+    TEXT_CACHE.set(key, lines, SurfacesCache.sizeof(*(surface for surface, _ in lines)), pinned)
+    return key
+
+def _render_multiline_text(text, color, rect, align, font_name):
     surfaces = []
     # split text into list of strings using newline character
     lines = text.splitlines()
     # Return a SysFont object corresponding to the longest string
-    font = get_pygame_font(max(lines, key=len),'nimbussansnarrow',rect.width,rect.height//len(lines))
+    font = get_pygame_font(max(lines, key=len),font_name,rect.width,rect.height//len(lines))
 
     for i, line in enumerate(lines):
         surface = font.render(line, True, color)
@@ -0,0 +1,191 @@
+import subprocess
+from threading import Thread, Condition
+
+
+class RingBuffer:
+    """Bytes buffer of fixed capacity shared by a producer thread and a
+    consumer thread. The producer waits while the buffer is full.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = bytearray(capacity)
+        self._start = 0
+        self._size = 0
+        self._closed = False
+        self._condition = Condition()
+
+    def __len__(self):
+        return self._size
+
+    def write(self, data):
+        """Append the data, wait while there is no room for it.
+
+        :return: False if the buffer has been closed meanwhile
+        :rtype: bool
+        """
+        view = memoryview(data)
+        while view:
+            with self._condition:
+                while self._size == self.capacity and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return False
+                end = (self._start + self._size) % self.capacity
+                count = min(len(view), self.capacity - self._size, self.capacity - end)
+                self._data[end:end + count] = view[:count]
+                self._size += count
+                self._condition.notify_all()
+            view = view[count:]
+        return True
+
+    def read(self, count):
+        """Remove and return at most ``count`` bytes, without waiting.
+        """
+        with self._condition:
+            count = min(count, self._size)
+            end = self._start + count
+            if end <= self.capacity:
+                data = bytes(self._data[self._start:end])
+            else:
+                data = bytes(self._data[self._start:]) + bytes(self._data[:end - self.capacity])
+            self._start = end % self.capacity
+            self._size -= count
+            self._condition.notify_all()
+        return data
+
+    def clear(self):
+        with self._condition:
+            self._start = 0
+            self._size = 0
+            self._closed = False
+            self._condition.notify_all()
+
+    def close(self):
+        """Wake up the producer, the data written afterwards is dropped.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class AudioStream:
+    """Audio track of a video decoded by a single ffmpeg process as raw PCM
+    (signed 16 bits) into a ring buffer. The process runs for the whole
+    playback and is only started again to seek.
+    """
+
+    SAMPLE_WIDTH = 2
+
+    def __init__(self, path, rate=44100, channels=2, speed=1, reverse=False, no_audio=False, duration=None,
+                 buffer_time=2):
+        """
+        :param path: path of the video
+        :type path: str
+        :param rate: number of samples per second
+        :type rate: int
+        :param channels: number of channels
+        :type channels: int
+        :param speed: playback speed
+        :type speed: float
+        :param reverse: play the audio backward
+        :type reverse: bool
+        :param no_audio: produce silence, the video has no audio track
+        :type no_audio: bool
+        :param duration: duration of the silence if there is no audio track
+        :type duration: float
+        :param buffer_time: seconds of audio decoded ahead
+        :type buffer_time: float
+        """
+        self.path = path
+        self.rate = rate
+        self.channels = channels
+        self.speed = speed
+        self.reverse = reverse
+        self.no_audio = no_audio
+        self.duration = duration
+        self.frame_size = self.SAMPLE_WIDTH * channels
+        self.buffer = RingBuffer(int(buffer_time * rate) * self.frame_size)
+        self.missing_ffmpeg = False
+        # Number of times the consumer has read less data than requested
+        self.underruns = 0
+        # Number of ffmpeg processes started
+        self.starts = 0
+        self._process = None
+        self._thread = None
+        self._finished = False
+
+    def _get_command(self, position):
+        if self.no_audio:
+            command = ["ffmpeg", "-f", "lavfi", "-i", f"anullsrc=r={self.rate}"]
+            if self.duration:
+                command += ["-t", str(max(0, self.duration - position) / self.speed)]
+        else:
+            command = ["ffmpeg", "-ss", str(position), "-i", self.path, "-vn"]
+            filters = []
+            if self.speed != 1:
+                filters.append(f"atempo={self.speed}")
+            if self.reverse:
+                filters.append("areverse")
+            if filters:
+                command += ["-af", ",".join(filters)]
+        return command + ["-f", "s16le", "-acodec", "pcm_s16le", "-ac", str(self.channels),
+                          "-ar", str(self.rate), "-loglevel", "quiet", "-"]
+
+    def start(self, position=0):
+        """Start decoding from the given position in seconds.
+        """
+        self.stop()
+        self.buffer.clear()
+        self._finished = False
+        try:
+            self._process = subprocess.Popen(self._get_command(position), stdin=subprocess.DEVNULL,
+                                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except FileNotFoundError:
+            self.missing_ffmpeg = True
+            self._finished = True
+            return
+        self.starts += 1
+        self._thread = Thread(target=self._threaded_read, args=(self._process,), daemon=True)
+        self._thread.start()
+
+    def _threaded_read(self, process):
+        while True:
+            data = process.stdout.read1(self.buffer.capacity // 4)
+            if not data or not self.buffer.write(data):
+                break
+        self._finished = True
+
+    def read(self, count):
+        """Return the next ``count`` bytes of audio. They are completed with
+        silence if the decoder is late, an empty result means the end of the
+        audio track.
+
+        :param count: number of bytes, multiple of :py:attr:`frame_size`
+        :type count: int
+        """
+        # The end of the track is read only once all the data is consumed
+        finished = self._finished
+        data = self.buffer.read(count)
+        if len(data) < count and not finished:
+            self.underruns += 1
+            data += bytes(count - len(data))
+        return data
+
+    def is_finished(self):
+        """Return True if the whole track has been read.
+        """
+        return self._finished and not len(self.buffer)
+
+    def stop(self):
+        """Stop the ffmpeg process.
+        """
+        self.buffer.close()
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process.stdout.close()
+            self._process = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
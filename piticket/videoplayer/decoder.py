@@ -0,0 +1,188 @@
+import cv2
+import numpy as np
+from threading import Thread, Condition
+
+
+class FrameRing:
+    """Fixed number of preallocated frame buffers shared by the decoder
+    thread (producer) and the drawing code (consumer).
+    """
+
+    def __init__(self, count, shape):
+        """
+        :param count: number of frames decoded ahead
+        :type count: int
+        :param shape: shape of a frame (height, width, channels)
+        :type shape: tuple
+        """
+        self.buffers = np.empty((count, *shape), dtype=np.uint8)
+        self.indexes = [0] * count
+        self._read = 0
+        self._size = 0
+        self._closed = False
+        self._condition = Condition()
+
+    def __len__(self):
+        return self._size
+
+    def acquire(self):
+        """Return the position of a free buffer, wait while all of them are
+        used. None is returned if the ring has been closed meanwhile.
+        """
+        with self._condition:
+            while self._size == len(self.buffers) and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                return None
+            return (self._read + self._size) % len(self.buffers)
+
+    def commit(self, position, index):
+        """Make the frame written in the buffer available.
+
+        :param position: position returned by :py:meth:`acquire`
+        :type position: int
+        :param index: index of the frame in the video
+        :type index: int
+        """
+        with self._condition:
+            self.indexes[position] = index
+            self._size += 1
+            self._condition.notify_all()
+
+    def peek(self, offset=0):
+        """Return the index in the video and the data of a decoded frame,
+        None if there is no such frame.
+
+        :param offset: 0 for the oldest frame, 1 for the next one...
+        :type offset: int
+        """
+        with self._condition:
+            if offset >= self._size:
+                return None
+            position = (self._read + offset) % len(self.buffers)
+            return self.indexes[position], self.buffers[position]
+
+    def release(self, count=1):
+        """Give the oldest buffers back to the decoder.
+        """
+        with self._condition:
+            count = min(count, self._size)
+            self._read = (self._read + count) % len(self.buffers)
+            self._size -= count
+            self._condition.notify_all()
+
+    def clear(self):
+        with self._condition:
+            self._read = 0
+            self._size = 0
+            self._closed = False
+            self._condition.notify_all()
+
+    def close(self):
+        """Wake up the decoder waiting for a free buffer.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class FrameDecoder:
+    """Thread reading, resizing and post-processing the frames of a video
+    ahead of time into a :py:class:`FrameRing`.
+
+    A frame which would be displayed too late according to the clock is
+    skipped without being resized nor post-processed.
+    """
+
+    def __init__(self, read, skip, frame_delay, post_process, interp, clock, count=4):
+        """
+        :param read: function returning (has_frame, data) for the given index,
+                     called with consecutive indexes and a free buffer of the
+                     ring, data is the buffer itself if it has been filled
+                     at the right size
+        :type read: callable
+        :param skip: function going over the given index without returning
+                     the frame, False if there is no such frame. The buffer
+                     given as second argument can be used as scratch space
+        :type skip: callable
+        :param frame_delay: seconds between two frames
+        :type frame_delay: float
+        :param post_process: function applied to the resized frames
+        :type post_process: callable
+        :param interp: OpenCV interpolation used to resize the frames
+        :type interp: int
+        :param clock: function returning the position of the playback in seconds
+        :type clock: callable
+        :param count: number of frames decoded ahead
+        :type count: int
+        """
+        self.read = read
+        self.skip = skip
+        self.frame_delay = frame_delay
+        self.post_process = post_process
+        self.interp = interp
+        self.clock = clock
+        self.count = count
+        self.ring = None
+        self.size = None
+        self.finished = False
+        # Frames skipped because they were late
+        self.dropped = 0
+        self._thread = None
+
+    def start(self, frame, size):
+        """Decode the frames from the given index at the given size.
+
+        :param frame: index of the next frame returned by ``read``
+        :type frame: int
+        :param size: size of the frames (width, height)
+        :type size: tuple
+        """
+        self.stop()
+        if self.ring is None or self.size != tuple(size):
+            self.size = tuple(size)
+            self.ring = FrameRing(self.count, (size[1], size[0], 3))
+        self.ring.clear()
+        self.finished = False
+        self._thread = Thread(target=self._threaded_decode, args=(frame,), daemon=True)
+        self._thread.start()
+
+    def is_running(self):
+        return self._thread is not None
+
+    def stop(self):
+        if self._thread is not None:
+            self.ring.close()
+            self._thread.join()
+            self._thread = None
+
+    def _threaded_decode(self, frame):
+        ring = self.ring
+        while True:
+            position = ring.acquire()
+            if position is None:
+                break
+            buffer = ring.buffers[position]
+            # The next frame is already due, this one would never be seen
+            if (frame + 1) * self.frame_delay < self.clock():
+                if not self.skip(frame, buffer):
+                    break
+                self.dropped += 1
+                frame += 1
+                continue
+
+            has_frame, data = self.read(frame, buffer)
+            if not has_frame:
+                break
+            if data is buffer:
+                pass
+            elif data.shape[:2] != buffer.shape[:2]:
+                cv2.resize(data, dsize=self.size, dst=buffer, interpolation=self.interp)
+            else:
+                buffer[...] = data
+            data = self.post_process(buffer)
+            if data is not buffer:
+                buffer[...] = data
+            ring.commit(position, frame)
+            frame += 1
+        self.finished = True
@@ -0,0 +1,81 @@
+import sys
+import cv2
+import numpy as np
+import pygame
+
+from piticket.pictures import to_display_format
+
+
+class FrameSink:
+    """Display-format surfaces the decoded frames are written into, one per
+    resolution. The pixels are converted in place from BGR to the format of
+    the surface, so once the first frame of a size is displayed, playing the
+    video does not allocate any surface nor pixel buffer.
+    """
+
+    def __init__(self):
+        self._surfaces = {}
+        self.frames = 0
+        # Surfaces created and bytes of pixels allocated for them
+        self.allocations = 0
+        self.allocated_bytes = 0
+
+    def get_stats(self):
+        """Return the number of frames written and of the allocations done
+        for them.
+        """
+        return {'frames': self.frames, 'allocations': self.allocations,
+                'allocated_bytes': self.allocated_bytes}
+
+    def get_surface(self, size):
+        """Return the surface of the given size, created the first time.
+
+        :param size: size of the frames (width, height)
+        :type size: tuple
+        """
+        surface = self._surfaces.get(size)
+        if surface is None:
+            surface = to_display_format(pygame.Surface(size), alpha=False)
+            self._surfaces[size] = surface
+            self.allocations += 1
+            self.allocated_bytes += surface.get_pitch() * size[1]
+        return surface
+
+    @staticmethod
+    def _get_conversion(surface):
+        """Return the OpenCV conversion writing BGR pixels in the order of the
+        bytes of the surface, None if it is not a 32 bits RGB surface.
+        """
+        if surface.get_bytesize() != 4 or sys.byteorder != 'little':
+            return None
+        shifts = surface.get_shifts()[:3]
+        if shifts == (16, 8, 0):
+            return cv2.COLOR_BGR2BGRA
+        if shifts == (0, 8, 16):
+            return cv2.COLOR_BGR2RGBA
+        return None
+
+    def write(self, data):
+        """Write a frame in the surface of its size and return this surface.
+
+        :param data: BGR pixels of shape (height, width, 3)
+        :type data: :py:class:`numpy.ndarray`
+        """
+        height, width = data.shape[:2]
+        surface = self.get_surface((width, height))
+        code = self._get_conversion(surface)
+        if code is None:
+            pixels = pygame.surfarray.pixels3d(surface)
+            pixels[...] = data.transpose(1, 0, 2)[..., ::-1]
+        else:
+            # The surface stays locked while its buffer is referenced
+            buffer = surface.get_buffer()
+            pixels = np.frombuffer(buffer, np.uint8).reshape(height, surface.get_pitch() // 4, 4)[:, :width]
+            cv2.cvtColor(data, code, dst=pixels)
+            del buffer
+        del pixels
+        self.frames += 1
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
@@ -1,54 +1,108 @@
+import time
 import pygame
-import os.path as osp
-from io import BytesIO
+from threading import Thread
 
 
-assets = osp.join(osp.dirname(__file__),'assets')
-
 class MixerHandler:
     def __init__(self):
         self.muted = False
         self.volume = 1
 
+        self.audio = None
+        self.channel = None
+
+        self.thread = None
+        self.stop_thread = False
+
+        self.position = 0
+
+        self.loaded = False
+        self.paused = False
+        self.active = False
+
     def get_busy(self):
-        return pygame.mixer.music.get_busy()
+        return self.active
 
-    def load(self, data):
-        pygame.mixer.music.load(wav_file)
-       
+    def load(self, audio):
+        """Play the PCM data of the audio stream.
+
+        :param audio: decoded audio track
+        :type audio: :py:class:`piticket.videoplayer.audio_stream.AudioStream`
+        """
+        self.unload()
+        if not pygame.mixer.get_init():
+            pygame.mixer.init(audio.rate, -8 * audio.SAMPLE_WIDTH, audio.channels)
+        self.audio = audio
+        self.channel = pygame.mixer.find_channel(True)
+        self.loaded = True
 
     def unload(self):
-        self.stop()
-        pygame.mixer.music.unload()
+        if self.loaded:
+            self.stop()
+            self.audio = None
+            self.thread = None
+            self.loaded = False
 
     def play(self):
-        pygame.mixer.music.play()
+        self.stop_thread = False
+        self.position = 0
+        self.active = True
+
+        self.thread = Thread(target=self._threaded_play)
+        self.thread.start()
+
+    def _threaded_play(self):
+        # Short sounds are queued on the channel as the audio is decoded
+        chunk = 1024 * self.audio.frame_size
+        while not self.stop_thread:
+            if self.paused or self.channel.get_queue() is not None:
+                time.sleep(0.005)
+                continue
+            data = self.audio.read(chunk)
+            if not data:
+                break
+            sound = pygame.mixer.Sound(buffer=data)
+            sound.set_volume(0 if self.muted else self.volume)
+            if self.channel.get_busy():
+                self.channel.queue(sound)
+            else:
+                self.channel.play(sound)
+            # Duration given to the mixer, ahead of the sound heard by less
+            # than two chunks
+            self.position += len(data) / self.audio.frame_size / self.audio.rate
+
+        while self.channel.get_busy() and not self.stop_thread:
+            time.sleep(0.005)
+        self.active = False
 
     def set_volume(self, vol):
-        self.volume = vol
-        pygame.mixer.music.set_volume(min(1.0, max(0.0, vol)))
+        self.volume = min(1.0, max(0.0, vol))
         
     def get_volume(self):
         return self.volume
 
     def get_pos(self):
-        return max(0, pygame.mixer.music.get_pos()) / 1000
+        return self.position
 
     def stop(self):
-        pygame.mixer.music.stop()
+        if self.loaded and self.thread is not None:
+            self.stop_thread = True
+            self.thread.join()
+            self.channel.stop()
+            self.position = 0
 
     def pause(self):
-        pygame.mixer.music.pause()
+        self.paused = True
+        if self.channel is not None:
+            self.channel.pause()
 
     def unpause(self):
-        # unpausing the mixer when nothing has been loaded causes weird behaviour 
-        if pygame.mixer.music.get_pos() != -1:
-            pygame.mixer.music.unpause()
+        self.paused = False
+        if self.channel is not None:
+            self.channel.unpause()
 
     def mute(self):
         self.muted = True 
-        pygame.mixer.music.set_volume(0)
 
     def unmute(self):
         self.muted = False 
-        self.set_volume(self.volume)
@@ -1,16 +1,14 @@
 import pyaudio
-import wave
 import math 
 import time
 import numpy as np
 from threading import Thread
-from io import BytesIO
 
 
 class PyaudioHandler:
     def __init__(self):
         self.stream = None
-        self.wave = None
+        self.audio = None
 
         self.thread = None
         self.stop_thread = False
@@ -30,19 +28,20 @@ class PyaudioHandler:
     def get_busy(self):
         return self.active
 
-    def load(self, bytes_):
-        self.unload()
+    def load(self, audio):
+        """Play the PCM data of the audio stream.
 
-        try:
-            self.wave = wave.open(BytesIO(bytes_), "rb")
-        except EOFError:
-            raise EOFError("Audio is empty. This may mean the file is corrupted. If your video has no audio track, try initializing it with no_audio=True.")
+        :param audio: decoded audio track
+        :type audio: :py:class:`piticket.videoplayer.audio_stream.AudioStream`
+        """
+        self.unload()
+        self.audio = audio
 
         if self.stream is None:
             self.stream = self.p.open(
-            format=self.p.get_format_from_width(self.wave.getsampwidth()),
-            channels=self.wave.getnchannels(),
-            rate=self.wave.getframerate(),
+            format=self.p.get_format_from_width(audio.SAMPLE_WIDTH),
+            channels=audio.channels,
+            rate=audio.rate,
             output=True)
 
         self.loaded = True
@@ -57,9 +56,7 @@ class PyaudioHandler:
         if self.loaded:
             self.stop()
 
-            self.wave.close()
-
-            self.wave = None 
+            self.audio = None 
             self.thread = None
 
             self.loaded = False
@@ -69,14 +66,13 @@ class PyaudioHandler:
         self.position = 0
         self.active = True
 
-        self.wave.rewind()
         self.thread = Thread(target=self._threaded_play)
 
         self.thread.start()
 
     def _threaded_play(self):
-        chunk = 2048
-        data = self.wave.readframes(chunk)
+        chunk = 2048 * self.audio.frame_size
+        data = self.audio.read(chunk)
 
         
         while data != b'' and not self.stop_thread:
@@ -93,9 +89,9 @@ class PyaudioHandler:
                     audio = (audio * 10**(db/20)).astype(np.int16)
     
                 self.stream.write(audio.tobytes())
-                data = self.wave.readframes(chunk)
+                self.position += len(data) / self.audio.frame_size / self.audio.rate
 
-                self.position += chunk / self.wave.getframerate()
+                data = self.audio.read(chunk)
 
         self.active = False
 
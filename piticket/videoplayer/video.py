@@ -1,9 +1,12 @@
 import cv2 
 import subprocess 
 import os
+import time
 import warnings
-from threading import Thread
 from .pyaudio_handler import PyaudioHandler
+from .audio_stream import AudioStream
+from .decoder import FrameDecoder
+from .video_stream import VideoStream
 from .error import Pyvidplayer2Error
 
 try:
@@ -22,7 +25,7 @@ else:
 
 
 class Video:
-    def __init__(self, path, chunk_size, max_threads, max_chunks, subs, post_process, interp, use_pygame_audio, reverse, no_audio, speed, youtube, quality):
+    def __init__(self, path, subs, post_process, interp, use_pygame_audio, reverse, no_audio, speed, youtube, quality):
         
         if speed != 1 and reverse:
             warnings.warn("Warning: Setting speed and reverse parameters simultaneously currently causes video/audio sync issues.")
@@ -52,17 +55,12 @@ class Video:
         self.current_size = self.original_size
         self.aspect_ratio = self.original_size[0] / self.original_size[1]
 
-        self.chunk_size = chunk_size
-        self.max_chunks = max_chunks
-        self.max_threads = max_threads
-
-        self._chunks = []
-        self._threads = []
         self._starting_time = 0
-        self._chunks_claimed = 0
-        self._chunks_played = 0
-        self._stop_loading = False
+        # The audio stream is started when the playback needs it
+        self._stream_started = False
         self.frame = 0
+        # The end of the video has been reached
+        self.ended = False
 
         self.frame_data = None
         self.frame_surf = None
@@ -89,14 +87,32 @@ class Video:
 
         self.speed = max(0.5, min(10, speed))
         self.reverse = reverse
+        self._missing_ffmpeg = False # for throwing errors
         self.no_audio = no_audio or self._test_no_audio()
 
-        self._missing_ffmpeg = False # for throwing errors
+        # One ffmpeg process decodes the audio for the whole playback
+        self._stream = AudioStream(self.path, speed=self.speed, reverse=self.reverse,
+                                   no_audio=self.no_audio, duration=self.duration)
 
         self._preloaded_frames = []
         if self.reverse:
             self._preload_frames()
 
+        # ffmpeg scales the frames to the displayed size while decoding them,
+        # the reversed frames are already decoded at their original size
+        self._frames = VideoStream(self.path, self.interp)
+
+        # Frames are read, resized and post-processed ahead by a thread, the
+        # oldest frame of the ring is the displayed one while _holding is True
+        self._decoder = FrameDecoder(self._read_frame, self._skip_frame, self.frame_delay,
+                                     self.post_func, self.interp, self.get_pos)
+        self._holding = False
+        # Decoded frames replaced before being displayed, frames displayed and
+        # frames displayed after the time of the next one
+        self._dropped = 0
+        self._presented = 0
+        self._late = 0
+
         self.play()
 
     def _get_stream_url(self, path, quality=0):
@@ -130,12 +146,56 @@ class Video:
 
         self._vid.set(cv2.CAP_PROP_POS_FRAMES, self.frame) 
 
-    def _chunks_len(self):
-        i = 0
-        for c in self._chunks:
-            if c is not None:
-                i += 1
-        return i
+    def _read_frame(self, frame, buffer):
+        if self.reverse:
+            index = self.frame_count - frame - 1
+            if 0 <= index < len(self._preloaded_frames):
+                return True, self._preloaded_frames[index]
+            return False, None
+        return self._frames.read(buffer), buffer
+
+    def _skip_frame(self, frame, buffer):
+        if self.reverse:
+            return 0 <= self.frame_count - frame - 1 < len(self._preloaded_frames)
+        return self._frames.read(buffer)
+
+    def _start_decoding(self):
+        self._holding = False
+        if not self.reverse:
+            self._frames.start(self.frame * self.frame_delay, self.current_size)
+        self._decoder.start(self.frame, self.current_size)
+
+    def _stop_decoding(self):
+        self._decoder.stop()
+        self._frames.stop()
+        self._holding = False
+
+    def _next_frame(self):
+        """Release the frames of the ring which are late and return the one
+        to display at the current position, None if it is not decoded yet or
+        if the displayed frame is still the right one.
+        """
+        ring = self._decoder.ring
+        p = self.get_pos()
+        start = 1 if self._holding else 0
+        offset = start
+        frame = None
+        while True:
+            item = ring.peek(offset)
+            if item is None or p <= item[0] * self.frame_delay:
+                break
+            frame = item
+            offset += 1
+        if frame is None:
+            return None
+        # The displayed frame stays in the ring until the next one replaces it
+        ring.release(offset - 1)
+        self._dropped += offset - 1 - start
+        self._presented += 1
+        if p > (frame[0] + 1) * self.frame_delay:
+            self._late += 1
+        self._holding = True
+        return frame
 
     def _convert_seconds(self, seconds):
         h = int(seconds // 3600)
@@ -164,77 +224,10 @@ class Video:
             p = subprocess.run(command, capture_output=True)
         except FileNotFoundError:
             self._missing_ffmpeg = True
+            return True
 
         return p.stdout == b''
 
-    def _threaded_load(self, index):
-        i = index # assigned to variable so another thread does not change it
-
-        self._chunks.append(None)
-
-        s = (self._starting_time + (self._chunks_claimed - 1) * self.chunk_size) / self.speed
-        
-        if self.no_audio:
-            command = [
-                "ffmpeg",
-                "-f",
-                "lavfi",
-                "-i",
-                "anullsrc",
-                "-t",
-                str(self._convert_seconds(min(self.chunk_size, self.duration - s) / self.speed)),
-                "-f",
-                "wav",
-                "-loglevel",
-                "quiet",
-                "-"
-            ]
-
-        else:
-
-            command = [
-                "ffmpeg",
-                "-i",
-                self.path,
-                "-ss",
-                self._convert_seconds(s),
-                "-t",
-                str(self._convert_seconds(self.chunk_size / self.speed)),
-                "-vn",
-                "-f",
-                "wav",
-                "-loglevel",
-                "quiet",
-                "-"
-            ]
-
-            filters = []
-    
-            if self.speed != 1:
-                filters += ["-af", f"atempo={self.speed}"]
-            if self.reverse:
-                filters += ["-af", "areverse"]
-            
-            command = command[:7] + filters + command[7:]
-
-        try:
-            p = subprocess.run(command, capture_output=True)
-        except FileNotFoundError:
-            self._missing_ffmpeg = True
-        
-        self._chunks[i - self._chunks_played - 1] = p.stdout
-
-    def _update_threads(self):
-        for t in self._threads:
-            if not t.is_alive():
-                self._threads.remove(t)
-
-        self._stop_loading = self._starting_time + self._chunks_claimed * self.chunk_size >= self.duration
-        if not self._stop_loading and len(self._threads) < self.max_threads and self._chunks_len() + len(self._threads) < self.max_chunks:
-            self._chunks_claimed += 1
-            self._threads.append(Thread(target=self._threaded_load, args=(self._chunks_claimed,)))
-            self._threads[-1].start()
-
     def _write_subs(self):
         p = self.get_pos()
         
@@ -246,62 +239,40 @@ class Video:
                 self.subs._write_subs(self.frame_surf)
 
     def _update(self):
-        if self._missing_ffmpeg:
+        if self._missing_ffmpeg or self._stream.missing_ffmpeg or self._frames.missing_ffmpeg:
             raise FileNotFoundError("Could not find FFMPEG. Make sure it's downloaded and accessible via PATH.")
-        
-        self._update_threads()
 
         n = False
         self.buffering = False
 
         if self._audio.get_busy() or self.paused:
+            if not self._decoder.is_running():
+                self._start_decoding()
+
+            frame = self._next_frame()
+            if frame is not None:
+                index, data = frame
+                self.frame = index + 1
+                self.frame_data = data
+                self.frame_surf = self._create_frame(data)
 
-            p = self.get_pos()
-
-            while p > self.frame * self.frame_delay:
-
-                if self.reverse:
-                    has_frame = True
-                    data = None
-                    try:
-                        data = self._preloaded_frames[self.frame_count - self.frame - 1]
-                    except IndexError:
-                        has_frame = False
-                else:
-                    
-                    self.buffering = True
-                    has_frame, data = self._vid.read()
-                    self.buffering = False
-
-                self.frame += 1
-
-                # optimized for high playback speeds
-                
-                if p > self.frame * self.frame_delay:
-                    continue
-                
-                if has_frame:
-                    if self.original_size != self.current_size:
-                        data = cv2.resize(data, dsize=self.current_size, interpolation=self.interp)
-                    data = self.post_func(data)
-
-                    self.frame_data = data
-                    self.frame_surf = self._create_frame(data)
-
-                    if self.subs is not None:
-                        self._write_subs()
-
-                    n = True
-                else:
-                    break
+                if self.subs is not None:
+                    self._write_subs()
+
+                n = True
+            elif not self._decoder.finished and self.get_pos() > self.frame * self.frame_delay:
+                self.buffering = True
 
         elif self.active:
-            if self._chunks and self._chunks[0] is not None:
-                self._chunks_played += 1
-                self._audio.load(self._chunks.pop(0))
+            if not self._stream_started:
+                self._stream.start(self._starting_time)
+                self._stream_started = True
+                self._start_decoding()
+                self._audio.load(self._stream)
                 self._audio.play()
-            elif self._stop_loading and self._chunks_played == self._chunks_claimed:
+            elif self._stream.is_finished():
                 self.stop()
+                self.ended = True
             else:
                 self.buffering = True
     
@@ -332,17 +303,26 @@ class Video:
         self.paused = False 
 
     def resize(self, size):
-        self.current_size = size
+        size = tuple(size)
+        if size != self.current_size:
+            self.current_size = size
+            self._resize_decoding()
 
     def change_resolution(self, height):
-        self.current_size = (int(height * self.aspect_ratio), height)
+        self.resize((int(height * self.aspect_ratio), height))
+
+    def _resize_decoding(self):
+        if self._decoder.is_running():
+            # Decode again at the new size from the frame after the displayed one
+            self._stop_decoding()
+            self._start_decoding()
 
     def close(self):
         self.stop()
+        self._stop_decoding()
         self._vid.release()
         self._audio.unload()
-        for t in self._threads:
-            t.join()
+        self._stream.stop()
         if not self.use_pygame_audio:
             self._audio.close()
 
@@ -376,8 +356,25 @@ class Video:
             self.paused = False
             self._audio.unpause()
 
+    def get_dropped_frames(self):
+        # Frames skipped by the decoder or never displayed
+        return self._dropped + self._decoder.dropped
+
+    def get_stats(self):
+        return {"presented": self._presented, "dropped": self.get_dropped_frames(), "late": self._late}
+
+    def get_next_frame_time(self):
+        # Time since the epoch when the next frame has to be displayed, None
+        # if the video is not playing
+        if not self.active or self.paused:
+            return None
+        if not self._audio.get_busy():
+            # Audio starting or ended, check again at the next frame
+            return time.time() + self.frame_delay
+        return time.time() + max(0, self.frame * self.frame_delay - self.get_pos()) / self.speed
+
     def get_pos(self):
-        return self._starting_time + max(0, self._chunks_played - 1) * self.chunk_size + self._audio.get_pos() * self.speed
+        return self._starting_time + self._audio.get_pos() * self.speed
 
     def seek(self, time, relative=True):
         # seeking accurate to 1 tenth of a second
@@ -385,17 +382,13 @@ class Video:
         self._starting_time = (self.get_pos() + time) if relative else time
         self._starting_time = round(min(max(0, self._starting_time), self.duration), 1)
 
-        for t in self._threads:
-            t.join()
-        self._chunks = []
-        self._threads = []
-        self._chunks_claimed = 0
-        self._chunks_played = 0
-
+        # The audio is decoded again from the new position when played
         self._audio.unload()
+        self._stream.stop()
+        self._stream_started = False
+        self._stop_decoding()
 
-        self._vid.set(cv2.CAP_PROP_POS_FRAMES, self._starting_time * self.frame_rate)
-        self.frame = int(self._vid.get(cv2.CAP_PROP_POS_FRAMES))
+        self.frame = int(round(self._starting_time * self.frame_rate))
         if self.subs is not None:
             self.subs._seek(self._starting_time)
 
@@ -410,8 +403,5 @@ class Video:
     
     def _render_frame(self):
         pass
-    
-    def preview(self):
-        pass
 
         
\ No newline at end of file
@@ -0,0 +1,84 @@
+import cv2
+import subprocess
+
+
+# Scaler of ffmpeg matching each OpenCV interpolation
+SCALE_FLAGS = {
+    cv2.INTER_NEAREST: "neighbor",
+    cv2.INTER_LINEAR: "bilinear",
+    cv2.INTER_CUBIC: "bicubic",
+    cv2.INTER_AREA: "area",
+    cv2.INTER_LANCZOS4: "lanczos",
+}
+
+
+class VideoStream:
+    """Frames of a video decoded by a single ffmpeg process, scaled to the
+    size they are displayed at and converted to raw BGR pixels. The process
+    is only started again to seek or to change the size.
+    """
+
+    def __init__(self, path, interp=cv2.INTER_LINEAR):
+        """
+        :param path: path of the video
+        :type path: str
+        :param interp: OpenCV interpolation used to scale the frames
+        :type interp: int
+        """
+        self.path = path
+        self.interp = interp
+        self.size = None
+        self.missing_ffmpeg = False
+        # Number of ffmpeg processes started
+        self.starts = 0
+        self._process = None
+
+    def _get_command(self, position, size):
+        scale = f"scale={size[0]}:{size[1]}:flags={SCALE_FLAGS.get(self.interp, 'bilinear')}"
+        return ["ffmpeg", "-ss", str(position), "-i", self.path, "-an", "-sn", "-vf", scale,
+                "-f", "rawvideo", "-pix_fmt", "bgr24", "-loglevel", "quiet", "-"]
+
+    def start(self, position, size):
+        """Start decoding from the given position in seconds.
+
+        :param position: position in seconds
+        :type position: float
+        :param size: size of the frames (width, height)
+        :type size: tuple
+        """
+        self.stop()
+        self.size = tuple(size)
+        try:
+            self._process = subprocess.Popen(self._get_command(position, size), stdin=subprocess.DEVNULL,
+                                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except FileNotFoundError:
+            self.missing_ffmpeg = True
+            return
+        self.starts += 1
+
+    def read(self, buffer):
+        """Write the next frame in the buffer.
+
+        :param buffer: array of shape (height, width, 3)
+        :type buffer: :py:class:`numpy.ndarray`
+        :return: False at the end of the video
+        :rtype: bool
+        """
+        if self._process is None:
+            return False
+        view = memoryview(buffer).cast('B')
+        while view:
+            count = self._process.stdout.readinto(view)
+            if not count:
+                return False
+            view = view[count:]
+        return True
+
+    def stop(self):
+        """Stop the ffmpeg process.
+        """
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process.stdout.close()
+            self._process = None
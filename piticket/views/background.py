@@ -3,14 +3,29 @@ import pygame
 import os.path as osp
 from pygame.event import Event, post
 from piticket.videoplayer import VideoPygame
-from piticket.utils import multiline_text_to_surfaces
+from piticket.utils import LOGGER, multiline_text_to_surfaces, SurfacesCache, FrameInput
 from piticket.pictures import get_filename
 from piticket.language import get_translated_text, get_supported_languages, get_current_lang, rearrange_supported_languages
-from piticket.views.box import Box, Header, Footer, RightSideBar, LeftSideBar, Button, Field
+from piticket.views.box import Box, Header, Footer, RightSideBar, LeftSideBar, Button, Field, find_boxes
 from piticket.views.row import RowView
+from piticket.views.hittest import HitTestGrid
+from piticket.views.layout import Layout
+
+# Pre-rendered static parts of the backgrounds, shared by the backgrounds
+# having the same chrome
+CHROME_CACHE = SurfacesCache(16 * 1024 * 1024)
 
 
 class Background():
+
+    # Backgrounds with the same chrome name draw the same static boxes
+    CHROME = 'default'
+
+    # The boxes are laid out again when the screen is resized, their sizes are
+    # fixed or stretched to their parent. Otherwise the background is built
+    # again for the new size, see piticket.views.registry
+    RELAYOUT = True
+
     def __init__(self, image_name, 
                 bg_color=(240, 240, 223), 
                 text_color=(0,0,0), 
@@ -113,11 +128,23 @@ class Background():
                                 border_radius=0, border_color=None, content=get_translated_text(self._name),
                                 content_color=self._text_color, content_position='center', color=self.get_color(),
                                 position=Box.TOPCENTER, interactable=False)
+        # The content area takes the space left by the header and the sidebar
+        self.main_content.STRETCH = 'both'
+        self.title.STRETCH = 'width'
 
         self._footer = None
         self._right_sidebar = None
 
-        self._need_update = None
+        # Paint the whole screen at the next frame
+        self._need_update = True
+        # All boxes of the background, built at the first paint
+        self._widgets = None
+        # Buttons indexed by position, built at the first paint
+        self._hit_grid = None
+        # Geometry of the boxes, computed again when the screen is resized
+        self._layout = None
+        self._hovered_button = None
+        self._pressed_button = None
 
         self.events = []
 
@@ -125,7 +152,110 @@ class Background():
         return "{}-{}".format(self._name, self.__class__.__name__)
 
     def handle_events(self, events=[]):
-        self.events = events
+        self.events = FrameInput.of(events)
+
+    def get_widgets(self):
+        """Return all the boxes of the background, including the boxes
+        held by other boxes.
+        """
+        if self._widgets is None:
+            self._widgets = []
+            seen = set()
+            for root in find_boxes(self):
+                for box in root.walk():
+                    if id(box) not in seen:
+                        seen.add(id(box))
+                        self._widgets.append(box)
+        return self._widgets
+
+    def next_update(self):
+        """Return the time when one of the boxes has to be refreshed, None
+        if the background only changes on events.
+        """
+        deadlines = [widget.next_update() for widget in self.get_widgets()]
+        deadlines = [deadline for deadline in deadlines if deadline is not None]
+        return min(deadlines) if deadlines else None
+
+    def get_pointed_choice(self):
+        """Return the ticket under the pointer, None if there is none.
+        """
+        return None
+
+    def close(self):
+        """Release the resources of the background when it is dropped by
+        the registry, it is not painted anymore.
+        """
+        pass
+
+    def set_language(self, translate):
+        """Display the texts of the boxes in the current language, the
+        background is kept when the language changes.
+
+        :param translate: function returning a text in the current language,
+                          None if the given text is not a translation
+        :type translate: callable
+        """
+        for widget in self.get_widgets():
+            if isinstance(widget.content, str):
+                text = translate(widget.content)
+                if text is not None:
+                    widget.content = text
+        self._need_update = True
+
+    def get_layout(self):
+        """Return the geometry of the boxes of the background.
+        """
+        if self._layout is None:
+            self._layout = Layout(self.get_widgets())
+        return self._layout
+
+    def get_hit_grid(self):
+        """Return the index of the buttons of the background by position.
+        """
+        if self._hit_grid is None:
+            widgets = self.get_widgets()
+            # The views move their rows and send them the events themselves
+            views = [widget for widget in widgets if isinstance(widget, RowView)]
+            rows = set(id(box) for view in views for box in view.walk() if box is not view)
+            self._hit_grid = HitTestGrid([widget for widget in widgets
+                                          if isinstance(widget, (Button, RowView))
+                                          and id(widget) not in rows])
+        return self._hit_grid
+
+    def dispatch_events(self, events):
+        """Send each pointer event to the topmost button under the pointer.
+        On mouse motion, the button left by the pointer is also notified.
+
+        :param events: events of the frame
+        :type events: list
+        :return: buttons which received an event
+        :rtype: list
+        """
+        grid = self.get_hit_grid()
+        buttons = []
+        for event in FrameInput.of(events).pointer:
+            target = grid.find(event.pos)
+            if event.type == pygame.MOUSEMOTION:
+                for button in (self._hovered_button, self._pressed_button):
+                    if button is not None and button is not target:
+                        button.handle_pointer(event, False)
+                        buttons.append(button)
+                self._hovered_button = target
+                self._pressed_button = None
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                self._pressed_button = target
+            elif event.type == pygame.MOUSEBUTTONUP:
+                self._pressed_button = None
+            if target is not None:
+                target.handle_pointer(event, True)
+                buttons.append(target)
+        return buttons
+
+    def force_update(self):
+        """Paint the whole screen at the next frame, for instance when something
+        else has been drawn over the background.
+        """
+        self._need_update = True
 
     def _write_texts(self, text, rect=None):
         """Create text surfaces to draw on window surface.
@@ -171,15 +301,72 @@ class Background():
             self._write_texts(text, rect)
 
     def resize(self, screen):
-        """Resize objects to fit to the screen
+        """Resize objects to fit to the screen. The boxes are laid out again
+        only when the size of the screen changes.
         """
         if self._rect != screen.get_rect():
             self._rect = screen.get_rect()
+            if self.get_layout().update(self._rect.size):
+                self._hit_grid = None
 
             self.resize_texts()
             self._need_update = True
 
     def paint(self, screen):
+        """Update the boxes and draw again the areas of the screen which have
+        changed since the previous call.
+
+        :param screen: surface to draw on
+        :type screen: pygame.Surface
+        :return: list of the modified areas
+        :rtype: list
+        """
+        widgets = self.get_widgets()
+        for widget in widgets:
+            widget.refresh()
+        buttons = self.dispatch_events(self.events)
+        if self._hovered_button is not None:
+            buttons.append(self._hovered_button)
+        for button in dict.fromkeys(buttons):
+            button.execute_callbacks()
+
+        if self._need_update:
+            rects = [screen.get_rect()]
+        else:
+            rects = [widget.rect.copy() for widget in widgets if widget.dirty]
+
+        if rects:
+            # Everything is drawn in the modified areas only, blits outside
+            # the clipping area are skipped by pygame
+            screen.set_clip(rects[0].unionall(rects[1:]))
+            self.draw(screen)
+            screen.set_clip(None)
+            for widget in widgets:
+                widget.mark_clean()
+        self._need_update = False
+        return rects
+
+    def get_chrome(self, screen):
+        """Return a surface of the size of the screen with the static parts of
+        the background already drawn, see :py:meth:`draw_chrome`. It is built
+        once per language, screen size and colors.
+
+        :param screen: surface on which the background is painted
+        :type screen: pygame.Surface
+        """
+        key = (self.CHROME, get_current_lang(), screen.get_size(),
+               tuple(self._bg_color), tuple(self._text_color))
+        chrome = CHROME_CACHE.get(key)
+        if chrome is None:
+            chrome = pygame.Surface(screen.get_size(), 0, screen)
+            self.draw_chrome(chrome)
+            CHROME_CACHE.set(key, chrome, SurfacesCache.sizeof(chrome))
+        return chrome
+
+    def draw_chrome(self, screen):
+        """Draw the elements which are neither interactive nor changing
+        with time.
+        """
         screen.fill(self._bg_color)
         for text_surface, pos in self._texts: 
             screen.blit(text_surface, pos)
@@ -197,14 +384,22 @@ class Background():
             self._footer.draw(screen)
         if self._header:
             self._header.draw(screen)
+
+    def draw(self, screen):
+        """Draw all the elements of the background.
+        """
+        screen.blit(self.get_chrome(screen), (0, 0))
+        if self._header:
+            # The date is the only part of the header changing with time
+            self._header.date.draw(screen)
         if self.main_content:
             self.main_content.draw(screen)
         if self.title:
             self.title.draw(screen)
         if self.cancel_button:
-            self.cancel_button.update(self.events, screen)
+            self.cancel_button.draw(screen)
         if self.back_button:
-            self.back_button.update(self.events, screen)
+            self.back_button.draw(screen)
 
 
 class IntroBackground(Background):
@@ -217,9 +412,30 @@ class VideoBackground(Background):
         self.video = VideoPygame(self._name)
 
     def paint(self, screen):
-        self.video.preview(screen)
+        # Only a new frame of the video is sent to the screen
+        if self.video.update(screen, force_draw=self._need_update):
+            self._need_update = False
+            return [screen.get_rect()]
+        return []
+
+    def next_update(self):
+        # The loop sleeps until the next frame of the video is due
+        return self.video.get_next_frame_time()
+
+    def close(self):
+        """Stop the video and its decoders.
+        """
+        LOGGER.debug("Video '%s' closed: %s, surfaces: %s", self._name, self.video.get_stats(),
+                     self.video.get_sink_stats())
+        self.video.close()
 
 class ChooseBackground(Background):
+
+    CHROME = 'choose'
+
+    # The lists share the width and the height left by the other boxes
+    RELAYOUT = False
+
     def __init__(self, tickets, surface):
         Background.__init__(self, 'choose', surface=surface)
         # Make back and cancel buttons None
@@ -302,6 +518,10 @@ class ChooseBackground(Background):
                         interactable=False)
         # split options into two views under travel box options
         # height = height - 5*self.travel_box_options.padding
+        # The first half of the tickets is displayed on the left, the rest
+        # on the right
+        items = list(tickets.items())
+        half = (len(items) + 1) // 2
         self.left_options = RowView(parent=self.travel_box_options,
                         x=0, y=0, width=self.title.width//2,
                         height=height, padding=20,
@@ -315,7 +535,7 @@ class ChooseBackground(Background):
                         color=self.get_color(),
                         position='top-left',
                         interactable=False,
-                        rows=tickets)
+                        rows=dict(items[:half]))
         self.right_options = RowView(parent=self.travel_box_options,
                         x=0, y=0, width=self.title.width//2,
                         height=height, padding=20,
@@ -329,7 +549,7 @@ class ChooseBackground(Background):
                         color=self.get_color(),
                         position='top-right',
                         interactable=False,
-                        rows=tickets)
+                        rows=dict(items[half:]))
         # Create options for the side bar
         # Show that card payment is available
         self.card_text = Box(parent=self.side_bar_top,
@@ -406,35 +626,61 @@ class ChooseBackground(Background):
                         position=Box.TOPCENTER)
         self.future_tickets.clicked(post,Event(pygame.MOUSEBUTTONUP,state='future_tickets'))
 
-    def paint(self,screen):
-        Background.paint(self,screen)
+    def draw(self, screen):
+        Background.draw(self, screen)
         if self.recharge_card:
-            self.recharge_card.update(self.events, screen)
+            self.recharge_card.draw(screen)
         if self.all_travels:
-            self.all_travels.update(self.events, screen)
+            self.all_travels.draw(screen)
         if self.collect_ticket:
-            self.collect_ticket.update(self.events, screen)
+            self.collect_ticket.draw(screen)
         if self.second_title:
             self.second_title.draw(screen)
         if self.travel_box_options:
             self.travel_box_options.draw(screen)
         if self.left_options:
-            self.left_options.update(self.events,screen)
+            self.left_options.draw(screen)
         if self.right_options:
-            self.right_options.update(self.events,screen)
-        if self.card_text:
-            self.card_text.draw(screen)
-        if self.card_payment:
-            self.card_payment.draw(screen)
+            self.right_options.draw(screen)
         if self.translations:
-            self.translations.update(self.events, screen)
+            self.translations.draw(screen)
         for flag in self.flags:
             flag.draw(screen)
         if self.future_tickets:
-            self.future_tickets.update(self.events, screen)
+            self.future_tickets.draw(screen)
+
+    def set_language(self, translate):
+        Background.set_language(self, translate)
+        # The flag of the current language is the bigger one, in the middle
+        for flag, lang in zip(self.flags, rearrange_supported_languages()):
+            size = (63, 42) if lang == get_current_lang() else (42, 28)
+            flag.content = get_filename(f'{lang}_flag.png')
+            flag.place(Layout.place((flag.position, 0, 0, size[0], size[1], None), self.translations.rect))
+        # Placement rules read again from the boxes
+        self._layout = None
+
+    def get_pointed_choice(self):
+        for view in (self.left_options, self.right_options):
+            if view:
+                choice = view.get_pointed_entry()
+                if choice is not None:
+                    return choice
+        return None
+
+    def draw_chrome(self, screen):
+        Background.draw_chrome(self, screen)
+        # Show that card payment is available
+        if self.card_text:
+            self.card_text.draw(screen)
+        if self.card_payment:
+            self.card_payment.draw(screen)
         
         
 class ChosenBackground(Background):
+
+    # The fields share the height of the main content
+    RELAYOUT = False
+
     def __init__(self, chosen_ticket, surface):
         Background.__init__(self, 'chosen', surface=surface)
         self.chosen_ticket = chosen_ticket
@@ -657,34 +903,34 @@ class ChosenBackground(Background):
             content_str += i
         self.total_field.input_box.content = content_str +' '+ self.chosen_ticket['currency']
 
-    def paint(self, screen):
-        Background.paint(self, screen)
+    def draw(self, screen):
+        Background.draw(self, screen)
         if self.departure_field:
-            self.departure_field.update(self.events,screen)
+            self.departure_field.draw(screen)
         if self.destination_field:
-            self.destination_field.update(self.events,screen)
+            self.destination_field.draw(screen)
         if self.date_field:
-            self.date_field.update(self.events,screen)
+            self.date_field.draw(screen)
         if self.departure_time_field:
-            self.departure_time_field.update(self.events,screen)
+            self.departure_time_field.draw(screen)
         if self.arrival_time_field:
-            self.arrival_time_field.update(self.events,screen)
+            self.arrival_time_field.draw(screen)
         if self.route_field:
-            self.route_field.update(self.events,screen)
+            self.route_field.draw(screen)
         if self.tickettype_field:
-            self.tickettype_field.update(self.events,screen)
+            self.tickettype_field.draw(screen)
         if self.class_field:
-            self.class_field.update(self.events,screen)
+            self.class_field.draw(screen)
         if self.railcard_field:
-            self.railcard_field.update(self.events,screen)
+            self.railcard_field.draw(screen)
         if self.adults_field:
-            self.adults_field.update(self.events,screen)
+            self.adults_field.draw(screen)
         if self.children_field:
-            self.children_field.update(self.events,screen)
+            self.children_field.draw(screen)
         if self.total_field:
-            self.total_field.update(self.events,screen)
+            self.total_field.draw(screen)
         if self.pay_button:
-            self.pay_button.update(self.events, screen)
+            self.pay_button.draw(screen)
 
 class ProcessingBackground(Background):
     def __init__(self, surface):
@@ -708,8 +954,8 @@ class ProcessingBackground(Background):
                                 position=Box.CENTER)
     
         
-    def paint(self, screen):
-        Background.paint(self, screen)
+    def draw(self, screen):
+        Background.draw(self, screen)
         if self.processing_box:
             self.processing_box.draw(screen)
 
@@ -718,8 +964,8 @@ class CalendarBackground(Background):
     def __init__(self, surface):
         Background.__init__(self, 'calendar', surface=surface)
     
-    def paint(self, screen):
-        Background.paint(self, screen)
+    def draw(self, screen):
+        Background.draw(self, screen)
 
 class RechargeBackground(Background):
     def __init__(self, surface):
@@ -788,9 +1034,13 @@ class RechargeBackground(Background):
                                 color=self.get_color(),
                                 position=None,
                                 interactable=False)
+        # The sizes depending on the main content follow it on resize
+        self.recharge_box.STRETCH = 'both'
+        self.recharge_text.STRETCH = 'width'
+        self.recharge_arrow.STRETCH = 'both'
     
-    def paint(self, screen):
-        Background.paint(self, screen)
+    def draw(self, screen):
+        Background.draw(self, screen)
         if self.recharge_box:
             self.recharge_box.draw(screen)
         if self.recharge_img:
@@ -879,27 +1129,31 @@ class TranslateBackground(Background):
                         position=Box.BOTTOMCENTER,
                         interactable=False)
 
-    def paint(self, screen):
-        Background.paint(self, screen)
+    def draw(self, screen):
+        Background.draw(self, screen)
         if self.translations_box:
             self.translations_box.draw(screen)
         if self.english_button:
-            self.english_button.update(self.events, screen)
+            self.english_button.draw(screen)
         if self.english_text:
             self.english_text.draw(screen)
         if self.french_button:
-            self.french_button.update(self.events, screen)
+            self.french_button.draw(screen)
         if self.french_text:
             self.french_text.draw(screen)
         if self.pidgin_button:
-            self.pidgin_button.update(self.events, screen)
+            self.pidgin_button.draw(screen)
         if self.pidgin_text:
             self.pidgin_text.draw(screen)
 
 class PayBackground(Background):
-    def __init__(self, ticket_filename, modified_ticket, surface):
+
+    # The ticket preview is placed from the size of the main content
+    RELAYOUT = False
+
+    def __init__(self, ticket_factory, modified_ticket, surface):
         Background.__init__(self, 'card_payment', surface=surface)
-        self.ticket_filename = ticket_filename
+        self.ticket_factory = ticket_factory
         self.pay_box = Box(parent=self.main_content,
                                 x=0, y=0,
                                 width=self.main_content.width,
@@ -941,13 +1195,16 @@ class PayBackground(Background):
                                 border=0,
                                 border_radius=15,
                                 border_color=(255,0,0), 
-                                content=get_filename(ticket_filename),
+                                content=None,
                                 content_color=(0,0,0),
                                 content_position=Box.CENTER,
                                 content_size=(750,450),
                                 color=self.get_color(),
                                 position=Box.CENTER,
                                 interactable=False)
+        # The preview is rendered from the ticket in memory at display size
+        size = self.ticket_box.rect.inflate(-2*self.ticket_box.padding, -2*self.ticket_box.padding).size
+        self.ticket_box.content = ticket_factory.get_preview(size)
         self.price_box = Box(parent=self.pay_box,
                                 x=self.ticket_box.x, 
                                 y=self.ticket_box.y+self.ticket_box.height+100,
@@ -982,10 +1239,10 @@ class PayBackground(Background):
                                 position=Box.BOTTOMCENTER)
     
     def __str__(self):
-        return Background.__str__(self)+f'{self.ticket_filename}'
+        return Background.__str__(self)+f'{self.ticket_factory}'
 
-    def paint(self, screen):
-        Background.paint(self, screen)
+    def draw(self, screen):
+        Background.draw(self, screen)
         if self.pay_box:
             self.pay_box.draw(screen)
         if self.nfc_box:
@@ -1016,8 +1273,8 @@ class PaymentSuccessfulBackground(Background):
                                 content_position=Box.CENTER,
                                 color=self.get_color(),
                                 position=Box.CENTER)
-    def paint(self, screen):
-        Background.paint(self, screen)
+    def draw(self, screen):
+        Background.draw(self, screen)
         if self.payment_status:
             self.payment_status.draw(screen)
 
@@ -1041,8 +1298,8 @@ class PaymentFailedBackground(Background):
                                 content_position=Box.CENTER,
                                 color=self.get_color(),
                                 position=Box.CENTER)
-    def paint(self, screen):
-        Background.paint(self, screen)
+    def draw(self, screen):
+        Background.draw(self, screen)
         if self.payment_status:
             self.payment_status.draw(screen)
 
@@ -1071,8 +1328,8 @@ class PrintBackground(Background):
     def resize(self, screen):
         Background.resize(self, screen)
         
-    def paint(self, screen):
-        Background.paint(self, screen)
+    def draw(self, screen):
+        Background.draw(self, screen)
         if self.print_box:
             self.print_box.draw(screen)
 
@@ -1096,7 +1353,9 @@ class FinishedBackground(Background):
                                 content_position=Box.CENTER,
                                 color=self.get_color(),
                                 position=Box.CENTER)
-    def paint(self, screen):
-        Background.paint(self, screen)
+        self.finished_box.STRETCH = 'width'
+
+    def draw(self, screen):
+        Background.draw(self, screen)
         if self.finished_box:
             self.finished_box.draw(screen)
\ No newline at end of file
@@ -1,10 +1,10 @@
 import pygame 
 import time
-import itertools
 import os.path as osp
 from PIL import Image
 from datetime import datetime
-from piticket.pictures import get_pygame_image, get_gifs
+from piticket.pictures import get_pygame_image
+from piticket.pictures.animation import get_animation
 from piticket.utils import multiline_text_to_surfaces
 from piticket.location import location
 
@@ -41,6 +41,21 @@ def create_content_surface(*images,rect=None,align='center'):
         surfaces.append((image,image.get_rect(x=x,y=y)))
     return surfaces
 
+def find_boxes(obj):
+    """Return the Box instances held by the attributes of an object, directly
+    or in a list. The parent of a Box is not part of the result.
+    :param obj: object to inspect, a Box or a background for instance
+    :type obj: object
+    """
+    boxes = []
+    for name, value in vars(obj).items():
+        if name == '_parent':
+            continue
+        for item in (value if isinstance(value, list) else [value]):
+            if isinstance(item, Box):
+                boxes.append(item)
+    return boxes
+
 class Box:
     TOPLEFT = 'top-left'
     TOPCENTER = 'top-center'
@@ -54,6 +69,11 @@ class Box:
     POSITIONS = [TOPLEFT, TOPCENTER, TOPRIGHT, CENTERLEFT, CENTER, 
                 CENTERRIGHT, BOTTOMLEFT, BOTTOMCENTER, BOTTOMRIGHT, None]
 
+    # Dimension following the size of the parent when the screen is resized
+    # ('width', 'height' or 'both'), the margin to the parent is kept, see
+    # piticket.views.layout
+    STRETCH = None
+
     def __init__(self, parent:object=None,
                 x:int=0, y:int=0, 
                 width:int=0, height:int=0,
@@ -96,6 +116,12 @@ class Box:
                     parent must be set at initialization
         :type parent: object
         """
+        # Box must be drawn on the screen at the next frame
+        self._dirty = True
+        # Content surfaces must be recreated before drawing
+        self._stale = True
+        self.__content = None
+
         self.parent = parent
         self.margin = margin 
         # Pass a tuple and create a pygame Rect: check setter
@@ -159,6 +185,38 @@ class Box:
         # Child rect without margin
         self._rect = pygame.Rect(rect)
 
+    @property
+    def content(self):
+        """Return the content (text, image path or surface): getter"""
+        return self.__content
+
+    @content.setter
+    def content(self, content):
+        """Set the content and mark the box as dirty if it has changed: setter"""
+        if self.__content != content:
+            self.__content = content
+            self._stale = True
+            self.mark_dirty()
+
+    @property
+    def dirty(self):
+        """Return True if the box has to be drawn again"""
+        return self._dirty
+
+    def mark_dirty(self):
+        """The box will be drawn again at the next frame"""
+        self._dirty = True
+
+    def mark_clean(self):
+        """The box is up to date on the screen"""
+        self._dirty = False
+
+    def walk(self):
+        """Yield this box and all the boxes it holds, recursively"""
+        yield self
+        for box in find_boxes(self):
+            yield from box.walk()
+
     @property
     def position(self):
         """Return position value: getter"""
@@ -241,6 +299,7 @@ class Box:
         """Position content within rect if it is passed or within Box. Possible align values are in self.POSITIONS
             and class attributes.
         """
+        self._stale = False
         if rect is None:
             rect = self.rect.copy() 
         if align is None:
@@ -259,7 +318,10 @@ class Box:
                 rect.width = self.content_size[0]
                 rect.height = self.content_size[1]
 
-            if not osp.isfile(content):
+            if isinstance(content, pygame.Surface):
+                # Picture already rendered at the size of the box
+                self.content_surfaces = create_content_surface(content,rect=rect,align=align)
+            elif not osp.isfile(content):
                 self.content_surfaces = multiline_text_to_surfaces(content, 
                                                             self.content_color, 
                                                             rect, 
@@ -270,6 +332,31 @@ class Box:
         # sub classes will use returned value if there are several contents to deal with
         return self.content_surfaces
 
+    def place(self, rect):
+        """Move and resize the box, its content is positioned again before
+        being drawn.
+
+        :param rect: new rect of the box
+        :type rect: pygame.Rect
+        """
+        self._rect = pygame.Rect(rect)
+        self.width, self.height = self._rect.size
+        self._stale = True
+        self.mark_dirty()
+
+    def move(self, dx, dy):
+        """Move the box and its content surfaces without rendering them again.
+
+        :param dx: horizontal offset in pixels
+        :type dx: int
+        :param dy: vertical offset in pixels
+        :type dy: int
+        """
+        self._rect.move_ip(dx, dy)
+        self.content_surfaces = [(surface, (pos[0] + dx, pos[1] + dy))
+                                 for surface, pos in self.content_surfaces]
+        self.mark_dirty()
+
     def _draw_text(self, screen):
         # By default, content surface must always be in the center of the box
         for content_surface, pos in self.content_surfaces:
@@ -337,6 +424,18 @@ class Box:
         else:
             pass
 
+    def refresh(self):
+        """Update the state of the box which depends on time, called at each
+        frame even if the box is not drawn.
+        """
+        pass
+
+    def next_update(self):
+        """Return the time when the box has to be refreshed again, None if
+        it only changes on events.
+        """
+        return None
+
     def update(self, event, screen):
         pass
 
@@ -344,6 +443,8 @@ class Box:
         return self
 
     def draw(self, screen):
+        if self._stale:
+            self.position_content()
         # Draw on the screen after preserving a copy
         self._draw_box(screen)
         self._draw_text(screen)
@@ -420,25 +521,41 @@ class Button(Box):
         for event in events:
             if not hasattr(event, 'pos'):
                 continue
-            if event.type == pygame.MOUSEBUTTONDOWN and self.rect.collidepoint(event.pos):
-                self._clicked = True
-                self._hovered = False
-                self._released = False
-            elif event.type == pygame.MOUSEBUTTONUP and self.rect.collidepoint(event.pos):
-                self._released = True 
-                self._clicked = False
-                self._hovered = False
-            elif event.type == pygame.MOUSEMOTION:
-                if self.rect.collidepoint(event.pos):
-                    self._hovered = True
-                elif not self.rect.collidepoint(event.pos):
-                    self._hovered = False
-                self._released = False 
-                self._clicked = False
-    
-    def update(self, event, screen):
-        self.handle_events(event)
-        self.draw(screen)
+            self.handle_pointer(event, self.rect.collidepoint(event.pos))
+
+    def handle_pointer(self, event, inside):
+        """Update the state of the button for a pointer event.
+
+        :param event: mouse event
+        :type event: pygame.event.Event
+        :param inside: True if the pointer is over the button
+        :type inside: bool
+        """
+        state = (self._clicked, self._hovered)
+        if event.type == pygame.MOUSEBUTTONDOWN and inside:
+            self._clicked = True
+            self._hovered = False
+            self._released = False
+        elif event.type == pygame.MOUSEBUTTONUP and inside:
+            self._released = True 
+            self._clicked = False
+            self._hovered = False
+        elif event.type == pygame.MOUSEMOTION:
+            self._hovered = bool(inside)
+            self._released = False 
+            self._clicked = False
+        if state != (self._clicked, self._hovered):
+            self.mark_dirty()
+
+    def process(self, events):
+        """Handle the events and execute the callback functions without drawing.
+        """
+        self.handle_events(events)
+        self.execute_callbacks()
+
+    def execute_callbacks(self):
+        """Execute the callback functions matching the state of the button.
+        """
         if self._released:
             if self._clicked_callback_func:
                 self._clicked_callback_func(*self._clicked_callback_args,
@@ -449,9 +566,14 @@ class Button(Box):
             if self._hovered_callback_func:
                 self._hovered_callback_func(*self._hovered_callback_args,
                                         **self._hovered_callback_kwargs)  
-                    
+
+    def update(self, event, screen):
+        self.process(event)
+        self.draw(screen)
 
     def draw(self, screen):
+        if self._stale:
+            self.position_content()
         if self._clicked:
             self._draw_clicked_box(screen)
             self._draw_text(screen)
@@ -489,7 +611,7 @@ class PopUpBox(Box):
         self._timeout = timeout
         self._timeout_text = ''
 
-        self._content = content
+        self._message = content
 
         Box.__init__(self, 
                 parent=parent, x=x, y=y,
@@ -549,11 +671,15 @@ class PopUpBox(Box):
         if self._end_time - self._start_time < 0:
             self.started = False
             self._triggered = True
-        self.content = self._timeout_text + self._content
+        self.content = self._timeout_text + self._message
         Box.position_content(self)
         # Get time for next loop
         self._start_time = time.time()
 
+    def next_update(self):
+        # The countdown changes every second
+        return self._end_time - max(int(self._end_time - time.time()), 0)
+
     def position_buttons(self):
         # Calculate the center coordinates
         x,y = self.rect.center
@@ -609,6 +735,8 @@ class PopUpBoxProcessing(Box):
         """
         self.event = event 
         self.gif_image = gif_image
+        # The frame of the gif to display depends on the time since the beginning
+        self._gif_start_time = time.time()
         self.post_event = post_event
 
         Box.__init__(self, 
@@ -637,9 +765,9 @@ class PopUpBoxProcessing(Box):
 
     @gif_image.setter
     def gif_image(self, gif_folder_name):
-        """Use folder name to return a generator of gif frame names
+        """Use folder name to get the animation (loaded once for all pop up boxes)
         """
-        self._gif_image = itertools.cycle(get_gifs(gif_folder_name)) 
+        self._gif_image = get_animation(gif_folder_name, (150, 150)) if gif_folder_name else None
 
     @property
     def started(self):
@@ -690,9 +818,13 @@ class PopUpBoxProcessing(Box):
 
     def draw(self, screen):
         Box.draw(self,screen)
-        img = next(self.gif_image) 
-        im = get_pygame_image(img,color=None,size=(150,150))
-        screen.blit(im,self.position_gif(im))
+        if self.gif_image:
+            self.gif_image.draw(screen, self.position_gif(self.gif_image), self._gif_start_time)
+
+    def next_update(self):
+        if self.gif_image:
+            return self.gif_image.get_next_frame_time(self._gif_start_time)
+        return None
         
     def update(self, event, screen):
         self.handle_events(event)
@@ -708,7 +840,37 @@ class PopUpBoxProcessing(Box):
             self._triggered = False
         
         
+class Clock(Box):
+    """Box displaying the current date and/or time. The text is formatted and
+    rendered again only when the displayed value changes.
+    """
+    def __init__(self, time_format='%d/%m/%y  %H:%M:%S', period=1, **kwargs):
+        """
+        :param time_format: format of the date, see :py:meth:`datetime.strftime`
+        :type time_format: str
+        :param period: smallest unit displayed by the format, in seconds
+        :type period: int
+        """
+        self.time_format = time_format
+        self.period = period
+        self._next_time = 0
+        Box.__init__(self, **kwargs)
+        self.refresh()
+
+    def refresh(self):
+        now = time.time()
+        if now >= self._next_time:
+            self.content = datetime.fromtimestamp(now).strftime(self.time_format)
+            self._next_time = (now // self.period + 1) * self.period
+
+    def next_update(self):
+        return self._next_time
+
+
 class Header(Box):
+
+    STRETCH = 'width'
+
     def __init__(self, parent=None, 
                 x=0, y=0, 
                 height=80, 
@@ -739,7 +901,6 @@ class Header(Box):
                 interactable=interactable)
 
         
-        d = datetime.fromtimestamp(time.time())
         self.box = Box(x=0, y=0, 
                         width=200, height=80,
                         position='top-left', 
@@ -764,33 +925,20 @@ class Header(Box):
                         color=color, 
                         parent=self.box,
                         interactable=False)
-        self.date = Box(x=10, y=10, 
+        self.date = Clock(time_format='%d/%m/%y  %H:%M:%S',
+                        x=10, y=10, 
                         width=200, height=40,
                         position='bottom-center',
                         margin=20, padding=10, 
                         border=0, border_radius=10, 
                         border_color=None, 
-                        content=f'{d.day}/{d.month}/{d.year}  {d.hour}:{d.minute}:{d.second}', 
                         content_color=(255,255,255), 
                         content_position='center',
                         color=color,
                         parent=self.box, 
                         interactable=False)
 
-    def position_content(self):
-        d = datetime.fromtimestamp(time.time())
-        if hasattr(self, 'date'):
-            self.date.content = d.strftime('%d/%m/%y  %H:%M:%S')
-            self.date.position_content()
-        Box.position_content(self)
-
     def draw(self, screen):
-        self.position_content()
-        width = screen.get_rect().width 
-        if self.width != width:
-            self.width = width 
-            self.rect = (self.x, self.y, self.width, self.height)
-            self.position_box()
         Box.draw(self, screen)
         self.box.draw(screen)
         self.date.draw(screen)
@@ -798,6 +946,9 @@ class Header(Box):
 
 
 class Footer(Box):
+
+    STRETCH = 'width'
+
     def __init__(self,parent=None, 
                 x=0, y=0,  
                 height=80, 
@@ -826,15 +977,10 @@ class Footer(Box):
                 color=color,
                 interactable=interactable)
 
-    def draw(self, screen):
-        width = screen.get_rect().width 
-        if self.width != width:
-            self.width = width 
-            self.rect = (self.x, self.y, self.width, self.height)
-            self.position_box()
-        Box.draw(self, screen)
-
 class LeftSideBar(Box):
+
+    STRETCH = 'height'
+
     def __init__(self,parent=None, 
                 x=0, y=0, width=80, 
                 margin=20, padding=10,
@@ -863,14 +1009,11 @@ class LeftSideBar(Box):
                 color=color,
                 interactable=interactable)
 
-    def draw(self, screen):
-        height = screen.get_rect().height 
-        if self.height != height:
-            self.height = height 
-            self.rect = (self.x, self.y, self.width, self.height)
-        Box.draw(self, screen)
     
 class RightSideBar(Box):
+
+    STRETCH = 'height'
+
     def __init__(self,parent=None, 
                 x=0, y=0, width=80, 
                 margin=20, padding=10,
@@ -899,12 +1042,6 @@ class RightSideBar(Box):
                 color=color,
                 interactable=interactable)
 
-    def draw(self, screen):
-        height = screen.get_rect().height 
-        if self.height != height:
-            self.height = height 
-            self.rect = (self.x, self.y, self.width, self.height)
-        Box.draw(self, screen)
 
 class Field(Box):
     def __init__(self, parent,
@@ -1061,11 +1198,14 @@ class Field(Box):
         self.label_box.draw(screen)
         self.input_box.draw(screen)
         self.button_box.draw(screen)
+        if self.button1:
+            self.button1.draw(screen)
+        if self.button2:
+            self.button2.draw(screen)
     
     def update(self, event, screen):
-        self.input_box.position_content()
-        self.draw(screen)
         if self.button1:
-            self.button1.update(event, screen)
+            self.button1.process(event)
         if self.button2:
-            self.button2.update(event, screen)
\ No newline at end of file
+            self.button2.process(event)
+        self.draw(screen)
\ No newline at end of file
@@ -0,0 +1,53 @@
+import pygame
+
+
+class Compositor():
+    """Accumulate the areas of the display modified during a frame, so that
+    only these areas are sent to the screen instead of the whole display.
+    """
+
+    def __init__(self):
+        self._rects = []
+
+    def add(self, *rects):
+        """Register areas of the display which have been modified.
+
+        :param rects: modified areas
+        :type rects: pygame.Rect or tuple
+        """
+        for rect in rects:
+            rect = pygame.Rect(rect)
+            if rect.width > 0 and rect.height > 0:
+                self._rects.append(rect)
+
+    def get_rects(self):
+        """Return the modified areas, overlapping areas are merged.
+
+        :return: list of pygame.Rect
+        :rtype: list
+        """
+        merged = []
+        for rect in self._rects:
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect = rect.union(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+
+    def clear(self):
+        """Forget the modified areas.
+        """
+        self._rects = []
+
+    def flush(self):
+        """Update the modified areas of the display and forget them.
+
+        :return: list of the updated areas
+        :rtype: list
+        """
+        rects = self.get_rects()
+        if rects:
+            pygame.display.update(rects)
+        self.clear()
+        return rects
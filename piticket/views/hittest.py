@@ -0,0 +1,52 @@
+class HitTestGrid():
+    """Uniform grid over the rects of the interactive boxes of a background.
+    Each cell knows the boxes overlapping it, so finding the box under a
+    position only tests the few boxes of one cell.
+    """
+
+    def __init__(self, boxes=(), cell_size=128):
+        """
+        :param boxes: boxes to register, the last ones are on top
+        :type boxes: list
+        :param cell_size: width and height of a cell in pixels
+        :type cell_size: int
+        """
+        self.cell_size = cell_size
+        self._cells = {}
+        self._count = 0
+        for box in boxes:
+            self.add(box)
+
+    def __len__(self):
+        return self._count
+
+    def _get_cells(self, rect):
+        size = self.cell_size
+        for i in range(rect.left // size, (rect.right - 1) // size + 1):
+            for j in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield (i, j)
+
+    def add(self, box):
+        """Register a box over the ones already registered.
+
+        :param box: box to register
+        :type box: :py:class:`piticket.views.box.Box`
+        """
+        if box.rect.width <= 0 or box.rect.height <= 0:
+            return
+        for cell in self._get_cells(box.rect):
+            self._cells.setdefault(cell, []).append(box)
+        self._count += 1
+
+    def find(self, pos):
+        """Return the topmost box containing the position, None if there is
+        no box at this position.
+
+        :param pos: position on the screen
+        :type pos: tuple
+        """
+        cell = (int(pos[0]) // self.cell_size, int(pos[1]) // self.cell_size)
+        for box in reversed(self._cells.get(cell, ())):
+            if box.rect.collidepoint(pos):
+                return box
+        return None
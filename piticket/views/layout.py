@@ -0,0 +1,135 @@
+import pygame
+
+from piticket.views.row import RowView
+
+
+class Layout():
+    """Geometry of the boxes of a background computed in a single pass.
+
+    The placement rule of each box (parent, position, offset and size) is read
+    once from the boxes, then the rects of the whole tree are computed into a
+    flat list, parents first. The pass is only done again when the size of the
+    screen changes, and only the boxes whose rect has changed are updated.
+    """
+
+    def __init__(self, boxes):
+        """
+        :param boxes: boxes to lay out, the rows of the views are moved by
+                      the views themselves and are ignored
+        :type boxes: list
+        """
+        self.boxes = []
+        self.parents = []
+        self.rules = []
+        self.rects = []
+        self.size = None
+        self._indexes = {}
+        for box in boxes:
+            self._add(box)
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def _add(self, box):
+        if id(box) in self._indexes:
+            return self._indexes[id(box)]
+        parent = box.parent
+        if isinstance(parent, RowView):
+            return None
+        if hasattr(parent, 'parent'):
+            # Parents are laid out before their children
+            parent_index = self._add(parent)
+            if parent_index is None:
+                return None
+            parent_rect = self.rects[parent_index]
+        else:
+            parent_index = -1
+            parent_rect = parent.get_rect()
+
+        width, height = box.rect.size
+        # A stretched size is stored as the margin to the size of the parent
+        if box.STRETCH in ('width', 'both'):
+            width = parent_rect.width - width
+        if box.STRETCH in ('height', 'both'):
+            height = parent_rect.height - height
+        rule = (box.position, box.x, box.y, width, height, box.STRETCH)
+        if self.place(rule, parent_rect) != box.rect:
+            # Box moved after its creation, keep it where it is in its parent
+            rule = (None, box.rect.x - parent_rect.x, box.rect.y - parent_rect.y,
+                    box.rect.width, box.rect.height, None)
+
+        self._indexes[id(box)] = len(self.boxes)
+        self.boxes.append(box)
+        self.parents.append(parent_index)
+        self.rules.append(rule)
+        self.rects.append(box.rect.copy())
+        return self._indexes[id(box)]
+
+    @staticmethod
+    def place(rule, parent_rect):
+        """Return the rect of a box in its parent, see :py:meth:`Box.position_box`.
+
+        :param rule: position, x, y, width, height and stretch of the box, the
+                     stretched sizes are margins to the size of the parent
+        :type rule: tuple
+        :param parent_rect: rect of the parent
+        :type parent_rect: pygame.Rect
+        """
+        position, x, y, width, height, stretch = rule
+        if stretch in ('width', 'both'):
+            width = parent_rect.width - width
+        if stretch in ('height', 'both'):
+            height = parent_rect.height - height
+        rect = pygame.Rect(x, y, width, height)
+        if not position:
+            rect.x = parent_rect.x + x
+            rect.y = parent_rect.y + y
+            return rect
+
+        if position.endswith('left'):
+            rect.x = parent_rect.left
+        elif position.endswith('center'):
+            rect.x = parent_rect.centerx - width//2
+        elif position.endswith('right'):
+            rect.x = parent_rect.right - width
+        if position.startswith('top'):
+            rect.y = parent_rect.top
+        elif position.startswith('center'):
+            rect.y = parent_rect.centery - height//2
+        elif position.startswith('bottom'):
+            rect.y = parent_rect.bottom - height
+        return rect
+
+    def compute(self, size):
+        """Compute the rects of all the boxes for a screen of the given size.
+
+        :param size: size of the screen
+        :type size: tuple
+        :return: boxes whose rect has changed
+        :rtype: list
+        """
+        screen_rect = pygame.Rect((0, 0), size)
+        changed = []
+        for i, rule in enumerate(self.rules):
+            parent = self.parents[i]
+            rect = self.place(rule, self.rects[parent] if parent >= 0 else screen_rect)
+            if rect != self.rects[i]:
+                self.rects[i] = rect
+                changed.append(self.boxes[i])
+        self.size = tuple(size)
+        return changed
+
+    def update(self, size):
+        """Move and resize the boxes if the size of the screen has changed.
+
+        :param size: size of the screen
+        :type size: tuple
+        :return: True if at least one box has changed
+        :rtype: bool
+        """
+        if self.size == tuple(size):
+            return False
+        changed = self.compute(size)
+        for box in changed:
+            box.place(self.rects[self._indexes[id(box)]])
+        return bool(changed)
@@ -0,0 +1,114 @@
+from collections import deque
+
+from piticket import language
+from piticket.utils import LOGGER, TEXT_CACHE, TEXT_LISTENERS, prerender_multiline_text
+
+
+class LanguagePacks():
+    """Translations rendered in all the supported languages at the sizes used
+    by the layouts.
+
+    Each time a translated text is rendered for a box, the same box is known
+    to display the text of this translation key in the other languages: they
+    are rendered in the text cache when the application is idle, so that
+    changing the language does not render any text again. The texts of the
+    current language are pinned, the others can be dropped to respect the
+    budget of the cache and are rendered again if needed.
+    """
+
+    def __init__(self):
+        self._keys = None
+        self._translations = {}
+        self._layouts = set()
+        self._pending = deque()
+        # Layouts of the rendered texts by language and cache key
+        self._rendered = {}
+        TEXT_LISTENERS.append(self.record)
+
+    def get_translation_key(self, text):
+        """Return the translation key of a text in any supported language,
+        None if the text is not a translation.
+        """
+        if self._keys is None:
+            self._keys = {}
+            for lang in language.get_supported_languages():
+                for key, translation in self.get_translations(lang).items():
+                    self._keys.setdefault(translation, key)
+        return self._keys.get(text)
+
+    def get_translations(self, lang):
+        """Return the texts of a language keyed by translation key.
+        """
+        if lang not in self._translations:
+            self._translations[lang] = language.get_translations(lang)
+        return self._translations[lang]
+
+    def translate(self, text):
+        """Return the text in the current language, None if the text is
+        not a translation.
+        """
+        key = self.get_translation_key(text)
+        if key is None:
+            return None
+        return self.get_translations(language.get_current_lang()).get(key)
+
+    def record(self, text, color, size, align, font_name):
+        """Register the layout of a rendered text if it is a translation.
+        """
+        key = self.get_translation_key(text)
+        if key is None:
+            return
+        layout = (key, tuple(color), tuple(size), align, font_name)
+        if layout not in self._layouts:
+            self._layouts.add(layout)
+            for lang in language.get_supported_languages():
+                self._pending.append((lang, layout))
+
+    def build(self):
+        """Render the next text of the packs.
+
+        :return: True if there are texts left to render
+        :rtype: bool
+        """
+        if not self._pending:
+            return False
+        lang, (key, color, size, align, font_name) = self._pending.popleft()
+        text = self.get_translations(lang).get(key)
+        if text:
+            layout = (key, color, size, align, font_name)
+            cache_key = prerender_multiline_text(text, color, size, align, font_name,
+                                                 pinned=lang == language.get_current_lang())
+            self._rendered.setdefault(lang, {})[cache_key] = layout
+        if not self._pending:
+            LOGGER.debug("Language packs ready: %s texts in %s language(s)",
+                         len(self._layouts), len(language.get_supported_languages()))
+        return bool(self._pending)
+
+    def set_language(self, lang):
+        """Pin the texts of the new current language and unpin the others.
+        The texts dropped from the cache meanwhile are rendered again.
+
+        :param lang: language code, for instance 'fr'
+        :type lang: str
+        """
+        for other, rendered in self._rendered.items():
+            if other != lang:
+                for cache_key in rendered:
+                    TEXT_CACHE.unpin(cache_key)
+        # Texts identical in several languages are pinned again here
+        rendered = self._rendered.get(lang, {})
+        for cache_key, layout in list(rendered.items()):
+            if not TEXT_CACHE.pin(cache_key):
+                del rendered[cache_key]
+                self._pending.appendleft((lang, layout))
+
+    def build_all(self):
+        """Render all the texts of the packs now, for instance at startup.
+        """
+        while self.build():
+            pass
+
+    def get_pending_count(self):
+        """Return the number of texts left to render.
+        """
+        return len(self._pending)
@@ -0,0 +1,136 @@
+from piticket.utils import LOGGER
+from piticket.language import get_current_lang
+
+
+class BackgroundsRegistry():
+    """Keep the backgrounds alive between frames: a background is built the
+    first time it is requested and then only updated and painted.
+
+    A background is rebuilt when one of the objects it was built from changes
+    (for instance the chosen ticket), or when it is explicitly invalidated.
+    When the screen is resized, its boxes are laid out again by
+    :py:meth:`Background.resize`, unless they are not only fixed or stretched
+    (see ``Background.RELAYOUT``), and when the language changes, only its
+    texts are changed.
+    """
+
+    def __init__(self):
+        self._backgrounds = {}
+        self._lang = None
+        self._size = None
+
+    def __contains__(self, name):
+        return name in self._backgrounds
+
+    def __len__(self):
+        return len(self._backgrounds)
+
+    def check(self, translate):
+        """Display the texts of the backgrounds in the current language if
+        it has changed since the previous call.
+
+        :param translate: function returning a text in the current language,
+                          None if the given text is not a translation
+        :type translate: callable
+        :return: True if the language has changed
+        :rtype: bool
+        """
+        lang = get_current_lang()
+        if lang == self._lang:
+            return False
+        if self._backgrounds:
+            LOGGER.debug("Language changed, translate %s background(s)", len(self._backgrounds))
+            for entry in self._backgrounds.values():
+                entry[1].set_language(translate)
+        changed = self._lang is not None
+        self._lang = lang
+        return changed
+
+    def check_size(self, size):
+        """Drop the backgrounds which cannot be laid out again if the size
+        of the screen has changed since the previous call, they are built
+        again when they are requested.
+
+        :param size: size of the screen
+        :type size: tuple
+        :return: True if the size has changed
+        :rtype: bool
+        """
+        size = tuple(size)
+        if size == self._size:
+            return False
+        names = [name for name, entry in self._backgrounds.items() if not entry[1].RELAYOUT]
+        if self._size is not None and names:
+            LOGGER.debug("Screen resized, drop %s background(s)", len(names))
+            for name in names:
+                self._drop(name)
+        changed = self._size is not None
+        self._size = size
+        return changed
+
+    def _drop(self, name):
+        entry = self._backgrounds.pop(name, None)
+        if entry is not None:
+            entry[1].close()
+
+    def _build(self, name, factory, args):
+        # The replaced background is not displayed anymore
+        self._drop(name)
+        self._backgrounds[name] = [args, factory(*args), True]
+
+    def _is_built_from(self, name, args):
+        entry = self._backgrounds.get(name)
+        return entry is not None and len(entry[0]) == len(args)\
+            and all(old is new for old, new in zip(entry[0], args))
+
+    def get(self, name, factory, *args):
+        """Return the background registered under ``name``. It is built by
+        calling ``factory(*args)`` if it does not exist yet or if one of the
+        given arguments is not the object used to build it.
+
+        :param name: name of the background
+        :type name: str
+        :param factory: background class or any callable returning a background
+        :type factory: callable
+        """
+        if not self._is_built_from(name, args):
+            LOGGER.debug("Build '%s' background", name)
+            self._build(name, factory, args)
+        entry = self._backgrounds[name]
+        # The background is going to be displayed
+        entry[2] = False
+        return entry[1]
+
+    def prebuild(self, name, factory, *args):
+        """Build a background before it is requested, see :py:meth:`get`.
+        It is kept by :py:meth:`invalidate` until it is requested. A background
+        already displayed is built again to start from its initial state, it
+        must not be the one currently displayed.
+        """
+        if not self._is_built_from(name, args) or not self._backgrounds[name][2]:
+            LOGGER.debug("Prebuild '%s' background", name)
+            self._build(name, factory, args)
+        return self._backgrounds[name][1]
+
+    def is_prebuilt(self, name, *args):
+        """Return True if the background is built from the given arguments
+        and has not been displayed yet.
+        """
+        return self._is_built_from(name, args) and self._backgrounds[name][2]
+
+    def peek(self, name):
+        """Return the background registered under ``name``, None if there
+        is none.
+        """
+        entry = self._backgrounds.get(name)
+        return entry[1] if entry else None
+
+    def invalidate(self, *names):
+        """Drop the given backgrounds, or all of them if no name is given.
+        The backgrounds never displayed are kept as they are in their initial
+        state.
+        """
+        for name in names or list(self._backgrounds):
+            entry = self._backgrounds.get(name)
+            if entry is not None and not entry[2]:
+                self._drop(name)
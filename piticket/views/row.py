@@ -1,3 +1,4 @@
+import time
 import pygame
 from piticket.views.box import Box, Button
 from piticket.utils import multiline_text_to_surfaces
@@ -54,6 +55,18 @@ class Row(Button):
         
 
 class RowView(Box):
+    """Scrollable list of rows. Only the rows of the visible window are
+    created: when the list is scrolled or paged, the rows leaving the window
+    are recycled to display the entries entering it.
+    """
+
+    # Distance in pixels the pointer must move before a press becomes a drag
+    DRAG_THRESHOLD = 10
+    # Part of the kinetic scroll speed lost per second
+    FRICTION = 4
+    # Kinetic scroll stops below this speed, in pixels per second
+    MIN_VELOCITY = 20
+
     def __init__(self, parent,
                 x, y, width, height, 
                 position, margin,
@@ -69,38 +82,222 @@ class RowView(Box):
                 border_color, content,
                 content_color, content_position,
                 color, interactable)
+        # Number of rows visible at once
         self.offset = 5
         self.start = 0
         self.end = self.start+self.offset 
-        # rows is a dictionary. pass only key which is a tuple
+        # rows is a dictionary, only the values are displayed
+        self.entries = list(rows.values())
         # Calculate width, height for each row based on the dimensions of the view, which 
         # which is the parent of the rows created below
-        height = height//self.offset
-        self.row_boxes = [Box(parent=self, x=0, y=i*height, 
-                            width=width, height=height,
+        self.row_height = height//self.offset
+        # One more row than the visible ones for the partially visible rows
+        count = min(self.offset + 1, len(self.entries))
+        self.row_boxes = [Box(parent=self, x=0, y=0, 
+                            width=width, height=self.row_height,
                             position=None, margin=0, 
                             padding=padding, border=border, 
                             border_radius=border_radius,
                             border_color=border_color,
                             content=None, content_color=(0,0,0),
                             content_position='center',
-                            color=color,  interactable=False) for i, row in enumerate(rows)]
+                            color=color,  interactable=False) for i in range(count)]
 
         self.rows = [Row(parent=row_box,
                         width=width-margin,
-                        height=height-margin,
+                        height=self.row_height-margin,
                         color=(0, 106, 78),
-                        row=rows[row]) for row_box, row in zip(self.row_boxes, rows)]
+                        row=None) for row_box in self.row_boxes]
         # post event when clicked
         for row in self.rows:
-            row.clicked(pygame.event.post, pygame.event.Event(pygame.MOUSEBUTTONUP,state='chosen',choice=row.content))
-        # self.chosen_row = None
+            row.clicked(self._post_choice, row)
 
-    def update(self, event, screen):
-        Box.draw(self, screen)
-        # position and draw parent boxes for each row
-        for row in self.row_boxes:
-            row.draw(screen)
-        # Draw clickable button for each row
+        # Scroll position in pixels
+        self.scroll = 0
+        self._velocity = 0
+        self._last_step = 0
+        self._drag = None
+        self._dragging = False
+        self._samples = []
+        self._hovered_row = None
+        self._pressed_row = None
+        self.layout_rows()
+
+    def place(self, rect):
+        # The rows are not laid out with the other boxes, they follow the view
+        dx = pygame.Rect(rect).x - self.rect.x
+        Box.place(self, rect)
+        if dx:
+            for row_box, row in zip(self.row_boxes, self.rows):
+                row_box.move(dx, 0)
+                row.move(dx, 0)
+        self.layout_rows()
+
+    def _post_choice(self, row):
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONUP,state='chosen',choice=row.content))
+
+    def get_max_scroll(self):
+        """Return the scroll position showing the last entries.
+        """
+        return max(0, len(self.entries) * self.row_height - self.rect.height)
+
+    def layout_rows(self):
+        """Place the rows according to the scroll position. A row keeps its
+        content, and thus its rendered texts, while its entry is visible.
+        """
+        first = int(self.scroll // self.row_height)
+        top = self.rect.y - int(self.scroll - first * self.row_height)
+        count = len(self.rows)
+        for index in range(first, first + count):
+            row_box = self.row_boxes[index % count]
+            row = self.rows[index % count]
+            dy = top + (index - first) * self.row_height - row_box.rect.y
+            if dy:
+                row_box.move(0, dy)
+                row.move(0, dy)
+            if index < len(self.entries):
+                row.content = self.entries[index]
+            else:
+                row.content = None
+        self.start = first
+        self.end = min(first + self.offset, len(self.entries))
+        self.mark_dirty()
+
+    def scroll_to(self, scroll):
+        """Scroll the list, the position is limited to the entries.
+
+        :param scroll: scroll position in pixels
+        :type scroll: float
+        :return: True if the position has changed
+        :rtype: bool
+        """
+        scroll = min(max(scroll, 0), self.get_max_scroll())
+        if scroll == self.scroll:
+            return False
+        self.scroll = scroll
+        self.layout_rows()
+        return True
+
+    def show_page(self, start):
+        """Scroll the list to display the entries from the given index.
+
+        :param start: index of the first entry to display
+        :type start: int
+        """
+        self._velocity = 0
+        self.scroll_to(start * self.row_height)
+
+    def next_page(self):
+        self.show_page(self.start + self.offset)
+
+    def previous_page(self):
+        self.show_page(self.start - self.offset)
+
+    def find_row(self, pos):
+        """Return the displayed row at the given position, None if there is
+        no row at this position.
+        """
+        if not self.rect.collidepoint(pos):
+            return None
         for row in self.rows:
-            row.update(event, screen)
+            if row.content is not None and row.rect.collidepoint(pos):
+                return row
+        return None
+
+    def get_pointed_entry(self):
+        """Return the entry of the row under the pointer, None if the
+        pointer is not over a row.
+        """
+        row = self._pressed_row or self._hovered_row
+        return row.content if row is not None else None
+
+    def handle_events(self, events):
+        for event in events:
+            if not hasattr(event, 'pos'):
+                continue
+            self.handle_pointer(event, self.rect.collidepoint(event.pos))
+
+    def handle_pointer(self, event, inside):
+        """Scroll the list when the pointer is dragged, otherwise send the
+        event to the row under the pointer.
+        """
+        row = self.find_row(event.pos) if inside else None
+        if event.type == pygame.MOUSEBUTTONDOWN and inside:
+            # Stop kinetic scrolling and wait to know if it is a click or a drag
+            self._velocity = 0
+            self._drag = (event.pos[1], self.scroll)
+            self._dragging = False
+            self._samples = [(time.time(), event.pos[1])]
+        elif event.type == pygame.MOUSEMOTION and self._drag:
+            if not inside:
+                self._end_drag()
+            else:
+                y, scroll = self._drag
+                if not self._dragging and abs(event.pos[1] - y) > self.DRAG_THRESHOLD:
+                    self._dragging = True
+                if self._dragging:
+                    self._samples = self._samples[-4:] + [(time.time(), event.pos[1])]
+                    self.scroll_to(scroll - (event.pos[1] - y))
+                    row = None
+        elif event.type == pygame.MOUSEBUTTONUP and self._drag:
+            dragging = self._dragging
+            self._end_drag()
+            if dragging:
+                # The release ends a drag, it is not a click
+                return
+
+        if event.type == pygame.MOUSEMOTION:
+            for other in (self._hovered_row, self._pressed_row):
+                if other is not None and other is not row:
+                    other.handle_pointer(event, False)
+            self._hovered_row = row
+            self._pressed_row = None
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            self._pressed_row = row
+        if row is not None:
+            row.handle_pointer(event, True)
+
+    def _end_drag(self):
+        if self._dragging and len(self._samples) > 1:
+            (t0, y0), (t1, y1) = self._samples[0], self._samples[-1]
+            if t1 > t0:
+                self._velocity = -(y1 - y0) / (t1 - t0)
+                self._last_step = time.time()
+        self._drag = None
+        self._dragging = False
+        self._samples = []
+
+    def execute_callbacks(self):
+        for row in self.rows:
+            row.execute_callbacks()
+
+    def refresh(self):
+        # Kinetic scrolling after a drag
+        if self._velocity:
+            now = time.time()
+            moved = self.scroll_to(self.scroll + self._velocity * (now - self._last_step))
+            self._velocity *= max(0, 1 - self.FRICTION * (now - self._last_step))
+            self._last_step = now
+            if not moved or abs(self._velocity) < self.MIN_VELOCITY:
+                self._velocity = 0
+
+    def next_update(self):
+        if self._velocity:
+            return time.time()
+        return None
+
+    def draw(self, screen):
+        Box.draw(self, screen)
+        # The rows partially visible must not be drawn outside the view
+        clip = screen.get_clip()
+        screen.set_clip(clip.clip(self.rect))
+        for row_box, row in zip(self.row_boxes, self.rows):
+            if row.content is not None:
+                row_box.draw(screen)
+                row.draw(screen)
+        screen.set_clip(clip)
+
+    def update(self, event, screen):
+        self.handle_events(event)
+        self.execute_callbacks()
+        self.draw(screen)
@@ -1,18 +1,39 @@
 import pygame 
 import os
+from collections import OrderedDict
 
 from pygame.event import post, Event
 from piticket.views import background
-from piticket.utils import LOGGER
-from piticket.language import get_translated_text
+from piticket.views.registry import BackgroundsRegistry
+from piticket.views.compositor import Compositor
+from piticket.views.packs import LanguagePacks
+from piticket.utils import LOGGER, SCHEDULER
+from piticket.language import get_translated_text, get_current_lang
 from piticket.payment_terminal import PAYMENT_STATUS_EVENT
 from piticket.views.box import PopUpBox, PopUpBoxProcessing
+from piticket.pictures import IMAGES_LOADER
 
 class PiWindow():
     """Change backgrounds """
 
     FULLSCREEN = 'fullscreen'
 
+    # Seconds waited for the pictures of a prebuilt background in an idle task
+    PREBUILD_WAIT = 0.005
+
+    # Backgrounds which can be built before they are displayed
+    FACTORIES = {'choose': background.ChooseBackground,
+                 'chosen': background.ChosenBackground,
+                 'calendar': background.CalendarBackground,
+                 'process': background.ProcessingBackground,
+                 'translate': background.TranslateBackground,
+                 'recharge': background.RechargeBackground,
+                 'pay': background.PayBackground,
+                 'print': background.PrintBackground,
+                 'successful': background.PaymentSuccessfulBackground,
+                 'unsuccessful': background.PaymentFailedBackground,
+                 'finish': background.FinishedBackground}
+
     def __init__(self, title,
                 bg_color=(255,255,255),
                 text_color=(0,0,0),
@@ -35,31 +56,172 @@ class PiWindow():
         self.is_fullscreen = False
         self.surface = pygame.display.set_mode(self.__size, pygame.RESIZABLE)
 
-        self.backgrounds = {}
+        self.backgrounds = BackgroundsRegistry()
+        self.backgrounds.check_size(self.surface.get_size())
         self.current_background = None
+        self.compositor = Compositor()
+        # Texts of the other languages are rendered when nothing happens
+        self.language_packs = LanguagePacks()
+        SCHEDULER.add_idle_task(self.language_packs.build)
+        # Next backgrounds built when nothing happens, painted off screen
+        self._prebuild_requests = OrderedDict()
+        self._prebuild_steps = None
+        self._prebuild_surface = None
+        SCHEDULER.add_idle_task(self._prebuild_next)
 
         self._popup_box = None
         self._popup_box_process = None 
+        # Background shown under the pop up box and copy of the hidden area
+        self._popup_background = None
+        self._popup_snapshot = None
         
 
-    def _update_background(self, bkgd, event=None):
-        # This allows a background to be initialized once and saved in the dictionary, backgrounds
-        self.current_background = self.backgrounds.setdefault(str(bkgd), bkgd)
+    def _check_language(self):
+        # The backgrounds are kept when the language changes, they only look
+        # for their texts in the new language
+        if self.backgrounds.check(self.language_packs.translate):
+            self.language_packs.set_language(get_current_lang())
+
+    def _update_background(self, name, factory, *args, event=None):
+        # Backgrounds are built once and kept in the registry, only the current
+        # one is updated and painted at each frame
+        self._check_language()
+        bkgd = self.backgrounds.get(name, factory, *args)
+        if self._popup_box is not None:
+            if bkgd is self._popup_background:
+                # Modal pop up box: the background is frozen under it
+                self._update_popup_box(event or [])
+                return
+            # The background has changed, the pop up box is not relevant anymore
+            self.close_popup_box()
+        if bkgd is not self.current_background:
+            # The screen still shows the previous background
+            bkgd.force_update()
+        self.current_background = bkgd
         self.current_background.set_color(self.bg_color)
         self.current_background.set_text_color(self.text_color)
         self.current_background.handle_events(event)
         self.current_background.resize(self.surface)
-        self.current_background.paint(self.surface)
+        self.compositor.add(*self.current_background.paint(self.surface))
+
+    def prebuild(self, name, *args):
+        """Build a background before it is displayed, when the application
+        is idle. The arguments are the ones of the matching show method,
+        the background is built again if they are different.
+
+        :param name: name of the background, see :py:attr:`FACTORIES`
+        :type name: str
+        """
+        if self.backgrounds.is_prebuilt(name, *args, self.surface):
+            return
+        self._prebuild_requests.pop(name, None)
+        self._prebuild_requests[name] = args
+
+    def _prebuild_next(self):
+        if self._prebuild_steps is None:
+            if not self._prebuild_requests:
+                return False
+            name, args = self._prebuild_requests.popitem(last=False)
+            self._prebuild_steps = self._prebuild(name, args)
+        if next(self._prebuild_steps, False) is False:
+            self._prebuild_steps = None
+        return self._prebuild_steps is not None or bool(self._prebuild_requests)
+
+    def _prebuild(self, name, args):
+        """Build a background in steps short enough to be run between two
+        frames, the generator yields True after each step.
+        """
+        bkgd = self.backgrounds.peek(name)
+        if bkgd is not None and bkgd is self.current_background:
+            return
+        # A first instance gives the pictures to decode in the worker thread,
+        # the texts are rendered in the cache at the same time
+        self._check_language()
+        with IMAGES_LOADER.collect():
+            self.FACTORIES[name](*args, self.surface).close()
+        yield True
+        while IMAGES_LOADER.convert(self.PREBUILD_WAIT):
+            yield True
+
+        self._check_language()
+        bkgd = self.backgrounds.prebuild(name, self.FACTORIES[name], *args, self.surface)
+        bkgd.set_color(self.bg_color)
+        bkgd.set_text_color(self.text_color)
+        yield True
+        # Stop if the background has been displayed or dropped meanwhile
+        if self.backgrounds.peek(name) is not bkgd or not self.backgrounds.is_prebuilt(name, *args, self.surface):
+            return
+        bkgd.resize(self.surface)
+        yield True
+        if self.backgrounds.peek(name) is not bkgd or not self.backgrounds.is_prebuilt(name, *args, self.surface):
+            return
+        # Render the texts, pictures and chrome of the first frame
+        if self._prebuild_surface is None or self._prebuild_surface.get_size() != self.surface.get_size():
+            self._prebuild_surface = pygame.Surface(self.surface.get_size(), 0, self.surface)
+        bkgd.draw(self._prebuild_surface)
+
+    def get_pointed_choice(self):
+        """Return the ticket under the pointer on the current background,
+        None if there is none.
+        """
+        if self.current_background and not self._popup_box:
+            return self.current_background.get_pointed_choice()
+        return None
+
+    def resize(self, size):
+        """Resize the window, for instance on a VIDEORESIZE event. The
+        boxes of the backgrounds are laid out again for the new size, or the
+        backgrounds are built again, see :py:meth:`BackgroundsRegistry.check_size`.
+
+        :param size: new size of the window
+        :type size: tuple
+        """
+        if self.is_fullscreen or tuple(size) == self.surface.get_size():
+            return
+        self.__size = tuple(size)
+        self._set_mode()
+
+    def toggle_fullscreen(self):
+        """Switch between the fullscreen and the windowed modes.
+        """
+        self.is_fullscreen = not self.is_fullscreen
+        self._set_mode()
+
+    def _set_mode(self):
+        self.close_popup_box()
+        if self.is_fullscreen:
+            self.surface = pygame.display.set_mode(self.display_size, pygame.FULLSCREEN)
+        else:
+            self.surface = pygame.display.set_mode(self.__size, pygame.RESIZABLE)
+        # Paint the whole screen at the next frame
+        self.current_background = None
+        self.backgrounds.check_size(self.surface.get_size())
+        LOGGER.debug("Window resized to %sx%s", *self.surface.get_size())
+
+    def update_display(self):
+        """Send the areas modified since the previous call to the screen.
+
+        :return: list of the updated areas
+        :rtype: list
+        """
+        return self.compositor.flush()
 
     def show_intro(self):
         """Show video as screen saver in sleep mode
         """
         video = '/home/pi/Videos/big_buck_bunny_1080p_stereo.avi'
         if os.path.isfile(video):
-            self._update_background(background.VideoBackground(video, self.surface))
+            self._update_background('intro', background.VideoBackground, video, self.surface)
         else:
-            self._update_background(background.IntroBackground(self.surface))
+            self._update_background('intro', background.IntroBackground, self.surface)
 
+    def stop_intro(self):
+        """Stop the video shown by :py:meth:`show_intro`, if any, it is
+        closed by the registry.
+        """
+        if self.current_background is self.backgrounds.peek('intro'):
+            self.current_background = None
+        self.backgrounds.invalidate('intro')
     
     def show_choice(self, events, tickets={}, selected=None):
         """Display all choices when nothing is selected
@@ -71,58 +233,58 @@ class PiWindow():
         :type selected: tuple
         """
         if not selected:
-            self._update_background(background.ChooseBackground(tickets, self.surface), events)
+            self._update_background('choose', background.ChooseBackground, tickets, self.surface, event=events)
         else:
-            self._update_background(background.ChosenBackground(selected, self.surface), events)
+            self._update_background('chosen', background.ChosenBackground, selected, self.surface, event=events)
 
     def show_calendar(self, event):
         """Display dates using a calendar.
         :param event: event for button effects
         :type event: pygame.event.Event
         """
-        self._update_background(background.CalendarBackground(self.surface), event)
+        self._update_background('calendar', background.CalendarBackground, self.surface, event=event)
 
     def show_processing(self):
         """Display while building ticket
         """
-        self._update_background(background.ProcessingBackground(self.surface))
+        self._update_background('process', background.ProcessingBackground, self.surface)
         
     def show_translations(self, event):
         """Display a list of available translations. Choose a language
         :param event: event for button effects
         :type event: pygame.event.Event
         """
-        self._update_background(background.TranslateBackground(self.surface), event)
+        self._update_background('translate', background.TranslateBackground, self.surface, event=event)
     
     def show_recharge(self, event):
         """Display option for recharging smart card.
         :param event: event for button effects
         :type event: pygame.event.Event
         """
-        self._update_background(background.RechargeBackground(self.surface), event)
+        self._update_background('recharge', background.RechargeBackground, self.surface, event=event)
 
-    def show_pay(self, event, filename, modified_ticket):
+    def show_pay(self, event, ticket_factory, modified_ticket):
         """Display instructions for payment
-        :param filename: the temporary filename where the ticket is stored.
-                    Read for display
-        :type filename: str
+        :param ticket_factory: the factory which built the ticket, the
+                    preview is rendered from its image in memory
+        :type ticket_factory: :py:class:`piticket.pictures.factory.TicketFactory`
         :param modified_ticket: details chosen by the user
         :type modified_ticket: dict
         """
-        self._update_background(background.PayBackground(filename, modified_ticket, self.surface), event)
+        self._update_background('pay', background.PayBackground, ticket_factory, modified_ticket, self.surface, event=event)
 
     def show_printing(self):
         """Display when printing ticket
         """
-        self._update_background(background.PrintBackground(self.surface))
+        self._update_background('print', background.PrintBackground, self.surface)
 
     def show_payment_status(self, successful=True):
         """Display the status of the payment.
         """
         if successful:
-            self._update_background(background.PaymentSuccessfulBackground(self.surface))
+            self._update_background('successful', background.PaymentSuccessfulBackground, self.surface)
         else:
-            self._update_background(background.PaymentFailedBackground(self.surface))
+            self._update_background('unsuccessful', background.PaymentFailedBackground, self.surface)
         
     def show_popup_box(self, state_name, timeout, app):
         """Show a pop up box on any state.
@@ -132,29 +294,33 @@ class PiWindow():
         :type timeout: int
         :param app: the main pi application 
         :type app: PiApplication
+        The pop up box is drawn over the current background at each frame
+        until it is closed, nothing is done if a pop up box is already shown.
         """
-        self._popup_box = PopUpBox(parent=self.surface, width=400, height=300,
-                                    content_color=(127,127,127), color=self.bg_color, timeout=timeout)
+        if self._popup_box is not None:
+            return
+        popup_box = PopUpBox(parent=self.surface, width=400, height=300,
+                             content_color=(127,127,127), color=self.bg_color, timeout=timeout)
         # End pop up box when Yes button is clicked and return to to same state
-        self._popup_box.btn1.clicked(app.post_event, state_name)
+        popup_box.btn1.clicked(app.post_event, state_name)
         # End pop up box when No button is clicked and return to wait state
-        self._popup_box.btn2.clicked(app.post_event, 'wait')
+        popup_box.btn2.clicked(app.post_event, 'wait')
         # End pop up box after timeout duration
-        self._popup_box.triggered(app.post_event, 'wait')
-
-        while self._popup_box.started:
-            events = pygame.event.get()
-            self._popup_box.update(events, self.surface)
-            pygame.display.update()
-
-        self._popup_box = None
+        popup_box.triggered(app.post_event, 'wait')
+        self._open_popup_box(popup_box)
     
     def show_popup_processing_box(self, text):
         """Create a pop up box with a gif for progress
         :param text: the key for translated text to be used when showing progress
-        :type text: str"""        
-        self._popup_box = PopUpBoxProcessing(event=Event(PAYMENT_STATUS_EVENT,),
-                                            post_event=True, 
+        :type text: str
+
+        The pop up box is closed when a payment status event is received, the
+        event stays available for the states of the application.
+        """
+        if self._popup_box is not None:
+            return
+        popup_box = PopUpBoxProcessing(event=Event(PAYMENT_STATUS_EVENT,),
+                                            post_event=False, 
                                             parent=self.surface,
                                             gif_image='Spinner_transparent',
                                             x=0, y=0,
@@ -170,17 +336,63 @@ class PiWindow():
                                             color=self.bg_color,
                                             interactable=False)
         # self._popup_box.triggered(post, Event(pygame.MOUSEBUTTONUP, status='approved', state=state_name))
-        while self._popup_box.started:
-            events = pygame.event.get()
-            self._popup_box.update(events, self.surface)
-            pygame.display.update()
+        self._open_popup_box(popup_box)
+
+    def _open_popup_box(self, popup_box):
+        self._popup_box = popup_box
+        self._popup_background = self.current_background
+        # Keep the area of the background hidden by the pop up box to restore
+        # it at each frame instead of painting the background again
+        rect = popup_box.rect.clip(self.surface.get_rect())
+        self._popup_snapshot = (self.surface.subsurface(rect).copy(), rect)
+
+    def _update_popup_box(self, events):
+        snapshot, rect = self._popup_snapshot
+        self.surface.blit(snapshot, rect)
+        self._popup_box.update(events, self.surface)
+        self.compositor.add(rect)
+        if not self._popup_box.started:
+            self.close_popup_box()
+
+    def close_popup_box(self):
+        """Remove the pop up box from the screen, if any.
+        """
+        if self._popup_box is None:
+            return
+        if self.current_background is self._popup_background:
+            snapshot, rect = self._popup_snapshot
+            self.surface.blit(snapshot, rect)
+            self.compositor.add(rect)
         self._popup_box = None
+        self._popup_background = None
+        self._popup_snapshot = None
+
+    def get_next_update(self):
+        """Return the time when the displayed boxes have to be refreshed, None
+        if they only change on events.
+        """
+        if self._popup_box is not None:
+            # The background is frozen under the pop up box
+            return self._popup_box.next_update()
+        if self.current_background:
+            return self.current_background.next_update()
+        return None
+
+    def is_popup_box_shown(self):
+        """Return True if a pop up box is displayed over the background.
+        """
+        return self._popup_box is not None
 
     def show_finish(self):
-        self._update_background(background.FinishedBackground(self.surface))
+        self._update_background('finish', background.FinishedBackground, self.surface)
 
-    def drop_cache(self):
-        """Drop all cached background and foreground to force refreshing the view.
+    def drop_cache(self, *names):
+        """Drop cached backgrounds to force refreshing the view. All the
+        backgrounds are dropped if no name is given (language change, new
+        ticket catalogue, ...).
+
+        :param names: names of the backgrounds to drop, for instance 'choose'
+        :type names: str
         """
-        self.current_background = None 
-        self.backgrounds = {}
+        self.current_background = None
+        self.backgrounds.invalidate(*names)
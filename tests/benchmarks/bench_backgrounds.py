@@ -0,0 +1,240 @@
+"""Measure the rendering of the backgrounds without opening a window.
+
+Each background is built with the sample tickets of the application, then
+painted while a scripted sequence of events is sent to it (pointer moving
+over each button, clicks, drags on the lists). The results are printed in
+JSON, for instance to compare them with the ones of a previous version::
+
+    python tests/benchmarks/bench_backgrounds.py --frames 200 --output bench.json
+"""
+
+import os
+import os.path as osp
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import traceback
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+# Run from a checkout, without installing the package
+sys.path.insert(0, osp.dirname(osp.dirname(osp.dirname(osp.abspath(__file__)))))
+
+import pygame
+
+from piticket import language
+from piticket.ticket import travels
+from piticket.utils import TEXT_CACHE, FrameInput
+from piticket.pictures import IMAGES_CACHE, get_filename
+from piticket.pictures.factory import get_ticket_factory
+from piticket.views import background
+from piticket.views.box import Button
+from piticket.views.row import RowView
+
+CACHES = {'text': TEXT_CACHE, 'images': IMAGES_CACHE, 'chrome': background.CHROME_CACHE}
+
+
+def get_modified_ticket(surface):
+    """Return the ticket posted by the pay button of the chosen background,
+    as in the application.
+    """
+    chosen = background.ChosenBackground(next(iter(travels.values())), surface)
+    pos = chosen.pay_button.rect.center
+    pygame.event.clear()
+    paint(chosen, surface, [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1),
+                            pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=1)])
+    for event in pygame.event.get(pygame.MOUSEBUTTONUP):
+        if getattr(event, 'state', None) == 'process':
+            return event.ticket
+    raise RuntimeError("The pay button did not post the ticket")
+
+
+def get_pay_arguments(surface):
+    ticket = get_modified_ticket(surface)
+    ticket.setdefault('date_printed', time.strftime('%d/%m/%y  %H:%M:%S'))
+    return get_ticket_factory(get_filename('nrc_trainticket.xml'), ticket), ticket
+
+
+def no_arguments(surface):
+    return ()
+
+
+# Class of each background and function returning its arguments, except the
+# screen surface, built before the measure
+BACKGROUNDS = {
+    'intro': (background.IntroBackground, no_arguments),
+    'choose': (background.ChooseBackground, lambda surface: (travels,)),
+    'chosen': (background.ChosenBackground, lambda surface: (next(iter(travels.values())),)),
+    'calendar': (background.CalendarBackground, no_arguments),
+    'translate': (background.TranslateBackground, no_arguments),
+    'recharge': (background.RechargeBackground, no_arguments),
+    'process': (background.ProcessingBackground, no_arguments),
+    'pay': (background.PayBackground, get_pay_arguments),
+    'successful': (background.PaymentSuccessfulBackground, no_arguments),
+    'unsuccessful': (background.PaymentFailedBackground, no_arguments),
+    'print': (background.PrintBackground, no_arguments),
+    'finish': (background.FinishedBackground, no_arguments),
+}
+
+
+def motion(pos):
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))
+
+
+def click(pos):
+    return [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1),
+            pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=1)]
+
+
+def drag(rect, steps=10):
+    """Return the frames of a vertical drag from the bottom to the top of the
+    rect, followed by the frames of the kinetic scrolling.
+    """
+    x, top, bottom = rect.centerx, rect.top + 5, rect.bottom - 5
+    frames = [[pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x, bottom), button=1)]]
+    for i in range(1, steps + 1):
+        frames.append([motion((x, bottom - (bottom - top) * i // steps))])
+    frames.append([pygame.event.Event(pygame.MOUSEBUTTONUP, pos=(x, top), button=1)])
+    return frames + [[]] * steps
+
+
+def get_script(bkgd):
+    """Return the events of each frame: hovering and clicking each button,
+    dragging each list and some frames without event.
+    """
+    frames = [[]]
+    for box in bkgd.get_widgets():
+        if isinstance(box, RowView):
+            frames.extend(drag(box.rect))
+        elif isinstance(box, Button) and bkgd.get_hit_grid().find(box.rect.center) is box:
+            frames.append([motion(box.rect.center)])
+            frames.append(click(box.rect.center))
+    frames.append([motion((0, 0))])
+    return frames + [[]] * 5
+
+
+def paint(bkgd, surface, events):
+    """Update and paint the background as the window does at each frame.
+    """
+    bkgd.handle_events(FrameInput(events))
+    bkgd.resize(surface)
+    return bkgd.paint(surface)
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(percent / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def get_caches_stats():
+    return {name: cache.get_stats() for name, cache in CACHES.items()}
+
+
+def get_rss():
+    """Return the resident memory of the process in kilobytes, None if it
+    cannot be read (Linux only).
+    """
+    try:
+        with open('/proc/self/statm') as fp:
+            pages = int(fp.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * resource.getpagesize() // 1024
+
+
+def get_peak_rss():
+    """Return the peak resident memory of the process in kilobytes.
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes on Linux
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def run(name, surface, frames):
+    """Return the measures of one background.
+    """
+    factory, get_arguments = BACKGROUNDS[name]
+    args = get_arguments(surface)
+    before = get_caches_stats()
+    rss = get_rss()
+    start = time.perf_counter()
+    bkgd = factory(*args, surface)
+    construction = time.perf_counter() - start
+
+    script = get_script(bkgd)
+    times = []
+    areas = 0
+    for i in range(frames):
+        events = script[i % len(script)]
+        start = time.perf_counter()
+        areas += len(paint(bkgd, surface, events))
+        times.append(time.perf_counter() - start)
+        # The callbacks of the buttons post events, nobody reads them
+        pygame.event.clear()
+
+    after = get_caches_stats()
+    if rss is not None:
+        # Memory kept by the background and the caches, the peak resident
+        # memory is only reported for the whole process
+        rss = get_rss() - rss
+    surfaces = {}
+    for cache in CACHES:
+        surfaces[cache] = {'created': after[cache]['misses'] - before[cache]['misses'],
+                           'bytes': after[cache]['bytes'] + after[cache]['pinned_bytes']
+                           - before[cache]['bytes'] - before[cache]['pinned_bytes']}
+    return {'construction_ms': construction * 1000,
+            'first_paint_ms': times[0] * 1000,
+            'paint_ms': {'p50': percentile(times, 50) * 1000,
+                         'p95': percentile(times, 95) * 1000,
+                         'p99': percentile(times, 99) * 1000,
+                         'max': max(times) * 1000},
+            'frames': frames,
+            'scripted_frames': len(script),
+            'painted_areas': areas,
+            'boxes': len(bkgd.get_widgets()),
+            'surfaces': surfaces,
+            'rss_delta_kb': rss}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help="backgrounds to measure, all by default: {}".format(', '.join(BACKGROUNDS)))
+    parser.add_argument('--frames', type=int, default=100, help="frames painted per background")
+    parser.add_argument('--size', default='1280x1000', help="size of the screen")
+    parser.add_argument('--output', help="write the results in this file instead of the standard output")
+    options = parser.parse_args(argv)
+    for name in options.names:
+        if name not in BACKGROUNDS:
+            parser.error("unknown background '{}'".format(name))
+
+    language.init(osp.join(tempfile.mkdtemp(), 'translations.cfg'), True)
+    pygame.init()
+    size = tuple(int(value) for value in options.size.split('x'))
+    surface = pygame.display.set_mode(size)
+
+    results = {'size': size, 'backgrounds': {}}
+    failed = False
+    for name in options.names or BACKGROUNDS:
+        try:
+            results['backgrounds'][name] = run(name, surface, options.frames)
+        except Exception as ex:
+            failed = True
+            results['backgrounds'][name] = {'error': repr(ex), 'traceback': traceback.format_exc()}
+    results['peak_rss_kb'] = get_peak_rss()
+    pygame.quit()
+
+    text = json.dumps(results, indent=2)
+    if options.output:
+        with open(options.output, 'w') as fp:
+            fp.write(text)
+    else:
+        print(text)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Measure the time to lay out the boxes of the backgrounds.
+
+Run it with ``python tests/benchmarks/bench_layout.py``, no window is opened.
+"""
+
+import os
+import os.path as osp
+import sys
+import tempfile
+import timeit
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+# Run from a checkout, without installing the package
+sys.path.insert(0, osp.dirname(osp.dirname(osp.dirname(osp.abspath(__file__)))))
+
+import pygame
+
+from piticket import language
+from piticket.ticket import travels
+from piticket.views import background
+
+SIZE = (1280, 1000)
+RESIZED = (1920, 1080)
+
+
+def build_backgrounds(surface):
+    """Return the backgrounds which can be built without a ticket file.
+    """
+    ticket = next(iter(travels.values()))
+    return [background.ChooseBackground(travels, surface),
+            background.ChosenBackground(ticket, surface),
+            background.TranslateBackground(surface),
+            background.RechargeBackground(surface),
+            background.ProcessingBackground(surface),
+            background.PrintBackground(surface),
+            background.FinishedBackground(surface)]
+
+
+def main(number=200):
+    language.init(osp.join(tempfile.mkdtemp(), 'translations.cfg'), True)
+    pygame.init()
+    surface = pygame.display.set_mode(SIZE)
+
+    results = []
+    for bkgd in build_backgrounds(surface):
+        build = timeit.timeit(bkgd.get_layout, number=1)
+        layout = bkgd.get_layout()
+
+        def resize():
+            # All the boxes depending on the size of the screen are moved
+            layout.compute(RESIZED)
+            layout.compute(SIZE)
+
+        compute = timeit.timeit(resize, number=number) / (2 * number)
+        results.append((len(layout), bkgd.__class__.__name__, build, compute))
+
+    results.sort(reverse=True)
+    print("{:<40} {:>6} {:>12} {:>12}".format('background', 'boxes', 'rules (ms)', 'layout (ms)'))
+    for count, name, build, compute in results:
+        print("{:<40} {:>6} {:>12.3f} {:>12.3f}".format(name, count, build * 1000, compute * 1000))
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
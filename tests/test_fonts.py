@@ -0,0 +1,59 @@
+import random
+import pygame
+from piticket.fonts import (fit_font_size, load_pygame_font, load_pil_font, get_pygame_font,
+                            get_filename, clear_cache)
+
+pygame.init()
+
+
+def largest_fitting_size(measure, max_width, max_height, max_size):
+    # Result of the binary search over [0, max_size]: largest size which
+    # fits plus one
+    fitting = [size for size in range(max_size)
+               if measure(size)[0] <= max_width and measure(size)[1] <= max_height]
+    return fitting[-1] + 1 if fitting else 0
+
+
+def test_fit_font_size_brute_force():
+    rand = random.Random(4)
+    for _ in range(300):
+        char_width = rand.uniform(0.2, 1.5)
+        length = rand.randint(1, 40)
+        lines = rand.randint(1, 3)
+        measure = lambda size: (int(size * char_width * length + size // 7), int(size * 1.2 * lines) + 1)
+        max_width, max_height = rand.randint(0, 800), rand.randint(0, 300)
+        max_size = int(max_height * 2)
+        assert fit_font_size('text', measure, max_width, max_height, max_size)\
+            == largest_fitting_size(measure, max_width, max_height, max_size)
+
+
+def test_fit_font_size_pygame_font():
+    for text, max_width, max_height in [('Lagos', 300, 60), ('Standard off-peak day return', 200, 40),
+                                        ('W', 5, 400), ('Abuja', 1000, 10)]:
+        measure = lambda size: load_pygame_font('nimbussansnarrow', size).size(text)
+        assert fit_font_size(text, measure, max_width, max_height, max_height * 2)\
+            == largest_fitting_size(measure, max_width, max_height, max_height * 2)
+
+
+def test_fit_font_size_nothing_fits():
+    assert fit_font_size('text', lambda size: (size + 10, size + 10), 5, 5, 10) == 0
+    assert fit_font_size('text', lambda size: (size, size), 0, 0, 0) == 0
+
+
+def test_fit_font_size_everything_fits():
+    assert fit_font_size('text', lambda size: (1, 1), 100, 100, 20) == 20
+
+
+def test_loaded_fonts_are_cached():
+    assert load_pygame_font('nimbussansnarrow', 20) is load_pygame_font('nimbussansnarrow', 20)
+    assert load_pygame_font('nimbussansnarrow', 20) is not load_pygame_font('nimbussansnarrow', 21)
+    path = get_filename('Monoid-Regular.ttf')
+    assert load_pil_font(path, 20) is load_pil_font(path, 20)
+    assert get_pygame_font('Lagos', 'nimbussansnarrow', 300, 60)\
+        is get_pygame_font('Lagos', 'nimbussansnarrow', 300, 60)
+
+
+def test_clear_cache():
+    font = load_pygame_font('nimbussansnarrow', 20)
+    clear_cache()
+    assert load_pygame_font('nimbussansnarrow', 20) is not font
@@ -0,0 +1,65 @@
+import random
+import pygame
+from piticket.views.hittest import HitTestGrid
+
+
+class FakeBox():
+
+    def __init__(self, x, y, width, height):
+        self.rect = pygame.Rect(x, y, width, height)
+
+
+def find_brute_force(boxes, pos):
+    for box in reversed(boxes):
+        if box.rect.width > 0 and box.rect.height > 0 and box.rect.collidepoint(pos):
+            return box
+    return None
+
+
+def test_overlapping_boxes():
+    bottom = FakeBox(0, 0, 200, 200)
+    top = FakeBox(50, 50, 50, 50)
+    grid = HitTestGrid([bottom, top], cell_size=64)
+    assert grid.find((60, 60)) is top
+    assert grid.find((99, 99)) is top
+    assert grid.find((100, 100)) is bottom
+    assert grid.find((10, 10)) is bottom
+    assert grid.find((200, 10)) is None
+
+
+def test_hidden_boxes():
+    covered = FakeBox(10, 10, 20, 20)
+    cover = FakeBox(0, 0, 100, 100)
+    collapsed = FakeBox(40, 40, 0, 30)
+    grid = HitTestGrid([covered, cover, collapsed], cell_size=64)
+    # Boxes without area are not registered
+    assert len(grid) == 2
+    assert grid.find((40, 50)) is cover
+    assert grid.find((15, 15)) is cover
+
+
+def test_boxes_crossing_cells():
+    box = FakeBox(60, 60, 10, 10)
+    grid = HitTestGrid([box], cell_size=64)
+    for pos in [(60, 60), (63, 63), (64, 64), (69, 60), (60, 69), (69, 69)]:
+        assert grid.find(pos) is box
+    for pos in [(59, 60), (70, 64), (64, 70), (128, 128)]:
+        assert grid.find(pos) is None
+
+
+def test_negative_positions():
+    box = FakeBox(-20, -20, 40, 40)
+    grid = HitTestGrid([box], cell_size=16)
+    assert grid.find((-20, -20)) is box
+    assert grid.find((19, 19)) is box
+    assert grid.find((-21, 0)) is None
+
+
+def test_same_result_as_brute_force():
+    rand = random.Random(11)
+    boxes = [FakeBox(rand.randint(-50, 800), rand.randint(-50, 600), rand.randint(0, 300), rand.randint(0, 200))
+             for _ in range(60)]
+    grid = HitTestGrid(boxes, cell_size=100)
+    for _ in range(2000):
+        pos = (rand.randint(-60, 1100), rand.randint(-60, 800))
+        assert grid.find(pos) is find_brute_force(boxes, pos)
@@ -0,0 +1,36 @@
+import pygame
+from piticket.utils import FrameInput
+
+def motion(pos, rel=(1, 1)):
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=rel, buttons=(0, 0, 0))
+
+def button(event_type, pos, **kwargs):
+    return pygame.event.Event(event_type, pos=pos, button=1, **kwargs)
+
+def test_coalesce_motion():
+    events = FrameInput([motion((i, i)) for i in range(100)])
+    assert len(events) == 1
+    assert events.merged == 99
+    assert events[0].pos == (99, 99)
+    assert events[0].rel == (100, 100)
+
+def test_coalesce_keeps_order():
+    events = FrameInput([motion((1, 1)), motion((2, 2)), button(pygame.MOUSEBUTTONDOWN, (2, 2)),
+                         motion((3, 3)), motion((4, 4)), button(pygame.MOUSEBUTTONUP, (4, 4))])
+    assert [event.type for event in events] == [pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN,
+                                                pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP]
+    assert [event.pos for event in events.pointer] == [(2, 2), (2, 2), (4, 4), (4, 4)]
+
+def test_coalesce_fingers():
+    fingers = [pygame.event.Event(pygame.FINGERMOTION, finger_id=finger, touch_id=0,
+                                  x=0.5, y=0.5, dx=0.1, dy=0.1) for finger in (0, 0, 1)]
+    events = FrameInput(fingers)
+    assert [(event.finger_id, round(event.dx, 1)) for event in events] == [(0, 0.2), (1, 0.1)]
+
+def test_query_by_type():
+    events = FrameInput([pygame.event.Event(pygame.QUIT), button(pygame.MOUSEBUTTONUP, (0, 0), state='wait')])
+    assert events.first(pygame.QUIT) is events[0]
+    assert events.first(pygame.KEYDOWN) is None
+    assert events.get(pygame.MOUSEBUTTONUP, pygame.FINGERUP)[0].state == 'wait'
+    assert events.has(pygame.QUIT)
+    assert FrameInput.of(events) is events
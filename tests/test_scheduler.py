@@ -0,0 +1,53 @@
+import time
+import pygame
+from piticket.utils import SCHEDULER, PoolingTimer
+from piticket.plugins.view_plugin import ViewPlugin
+
+pygame.init()
+
+
+class FakeApp():
+    ticket_choices = {}
+
+
+class FakeWindow():
+
+    def __init__(self):
+        self.popups = []
+
+    def show_choice(self, events, tickets={}, selected=None):
+        pass
+
+    def get_pointed_choice(self):
+        return None
+
+    def prebuild(self, name, *args):
+        pass
+
+    def show_popup_box(self, state_name, timeout, app):
+        self.popups.append((state_name, time.time()))
+
+
+def test_popup_shown_without_idle_frames():
+    idle_fps = SCHEDULER.idle_fps
+    SCHEDULER.idle_fps = 0
+    try:
+        plugin = ViewPlugin(None)
+        for timer in (plugin.finish_view_timer, plugin.print_view_timer, plugin.process_view_timer):
+            timer.reset()
+        plugin.screen_lock_timer = PoolingTimer(0.5, start=False)
+        plugin.popup_timer = PoolingTimer(0.2, start=False)
+        app, win = FakeApp(), FakeWindow()
+        pygame.event.clear()
+
+        start = time.time()
+        plugin.state_choose_enter(None, app, win)
+        while not win.popups and time.time() - start < 2:
+            plugin.state_choose_do(None, app, win, SCHEDULER.wait())
+    finally:
+        SCHEDULER.idle_fps = idle_fps
+
+    assert win.popups
+    state_name, shown = win.popups[0]
+    assert state_name == 'choose'
+    assert 0.2 <= shown - start < 0.4
@@ -0,0 +1,44 @@
+from piticket.search import fold, DestinationIndex
+
+catalogue = {('Abéokuta', '8000', 'Standard off-peak day return'): {},
+             ('Abuja', '25000', 'Standard off-peak day return'): {},
+             ('Abuja', '18000', 'Standard single'): {},
+             ('Port Harcourt', '30000', 'Standard single'): {},
+             ('Kaduna', '20000', 'Standard off-peak day return'): {}}
+index = DestinationIndex(catalogue, aliases={'Port Harcourt': ['PHC'], 'Abuja': ['ABJ']})
+
+def test_fold():
+    assert fold('  ABÉOKUTA   Central ') == 'abeokuta central'
+
+def test_search_prefix():
+    assert [key[0] for key in index.search('ab')] == ['Abéokuta', 'Abuja', 'Abuja']
+    assert index.search('abu') == [('Abuja', '18000', 'Standard single'),
+                                   ('Abuja', '25000', 'Standard off-peak day return')]
+    assert index.search('x') == []
+
+def test_search_accents_and_case():
+    assert index.search('ABEO') == index.search('abéo')
+    assert len(index.search('abeo')) == 1
+
+def test_search_words_and_aliases():
+    assert [key[0] for key in index.search('harc')] == ['Port Harcourt']
+    assert [key[0] for key in index.search('phc')] == ['Port Harcourt']
+    assert [key[0] for key in index.search('port h')] == ['Port Harcourt']
+
+def test_search_limit():
+    assert len(index.search('', limit=2)) == 2
+
+def test_typeahead():
+    typeahead = index.typeahead()
+    typeahead.type('A')
+    assert len(typeahead.results()) == 3
+    typeahead.type('bu')
+    assert len(typeahead.results()) == 2
+    typeahead.type('x')
+    assert typeahead.results() == []
+    typeahead.erase()
+    assert len(typeahead.results()) == 2
+    typeahead.clear()
+    typeahead.type('Port ')
+    typeahead.type('Har')
+    assert [key[0] for key in typeahead.results()] == ['Port Harcourt']
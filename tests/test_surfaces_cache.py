@@ -0,0 +1,85 @@
+import pygame
+from piticket.utils import SurfacesCache
+
+
+def test_sizeof():
+    surface = pygame.Surface((10, 4), 0, 32)
+    assert SurfacesCache.sizeof(surface, surface) == 2 * surface.get_pitch() * 4
+
+
+def test_lru_eviction_by_bytes():
+    cache = SurfacesCache(100)
+    cache.set('a', 'A', 40)
+    cache.set('b', 'B', 40)
+    # 'a' becomes the most recently used entry
+    assert cache.get('a') == 'A'
+    cache.set('c', 'C', 40)
+    assert 'b' not in cache
+    assert cache.get('a') == 'A' and cache.get('c') == 'C'
+    assert cache.bytes == 80
+    # Too big to be kept with the others
+    cache.set('d', 'D', 90)
+    assert len(cache) == 1 and cache.get('d') == 'D'
+    assert cache.bytes == 90
+
+
+def test_set_replaces_entry():
+    cache = SurfacesCache(100)
+    cache.set('a', 'A', 40)
+    cache.set('a', 'A2', 60)
+    assert len(cache) == 1
+    assert cache.get('a') == 'A2'
+    assert cache.bytes == 60
+
+
+def test_resize():
+    cache = SurfacesCache(100)
+    for key in 'abc':
+        cache.set(key, key, 30)
+    cache.resize(50)
+    assert 'a' not in cache and 'b' not in cache and 'c' in cache
+    assert cache.max_bytes == 50 and cache.bytes == 30
+
+
+def test_pin_unpin():
+    cache = SurfacesCache(100)
+    assert not cache.pin('a')
+    cache.set('a', 'A', 60)
+    assert cache.pin('a')
+    assert cache.pin('a')
+    assert cache.bytes == 0 and cache.pinned_bytes == 60
+    # Pinned bytes are counted in the budget, but never dropped
+    cache.set('b', 'B', 30)
+    cache.set('c', 'C', 30)
+    assert 'a' in cache and 'b' not in cache and 'c' in cache
+    cache.set('d', 'D', 200, pinned=True)
+    assert 'c' not in cache
+    assert cache.get('a') == 'A' and cache.get('d') == 'D'
+
+    assert cache.unpin('d')
+    assert not cache.unpin('d')
+    # Unpinned entry is dropped as soon as it exceeds the budget
+    assert 'd' not in cache
+    assert cache.unpin('a')
+    assert cache.get('a') == 'A'
+    assert cache.pinned_bytes == 0 and cache.bytes == 60
+
+
+def test_clear_drops_pinned():
+    cache = SurfacesCache(100)
+    cache.set('a', 'A', 10, pinned=True)
+    cache.set('b', 'B', 10)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.bytes == 0 and cache.pinned_bytes == 0
+
+
+def test_stats():
+    cache = SurfacesCache(100)
+    cache.set('a', 'A', 10, pinned=True)
+    cache.set('b', 'B', 20)
+    cache.get('a')
+    cache.get('b')
+    cache.get('x')
+    assert cache.get_stats() == {'entries': 1, 'bytes': 20, 'max_bytes': 100,
+                                 'pinned': 1, 'pinned_bytes': 10, 'hits': 2, 'misses': 1}
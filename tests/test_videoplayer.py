@@ -0,0 +1,369 @@
+import time
+import cv2
+import numpy as np
+import pygame
+from threading import Thread
+from piticket.videoplayer.audio_stream import RingBuffer
+from piticket.videoplayer.decoder import FrameRing, FrameDecoder
+from piticket.videoplayer.frame_sink import FrameSink
+from piticket.videoplayer.video import Video
+from piticket.videoplayer.videopygame import VideoPygame
+
+
+def wait_for(condition, timeout=2):
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+        time.sleep(0.001)
+    return condition()
+
+
+def test_ring_buffer_wraparound():
+    buffer = RingBuffer(8)
+    assert buffer.write(b'abcdef')
+    assert buffer.read(4) == b'abcd'
+    # Written at the end then at the beginning of the data
+    assert buffer.write(b'ghijk')
+    assert len(buffer) == 7
+    assert buffer.read(7) == b'efghijk'
+    assert len(buffer) == 0
+
+
+def test_ring_buffer_partial_reads():
+    buffer = RingBuffer(8)
+    assert buffer.read(4) == b''
+    buffer.write(b'abc')
+    assert buffer.read(10) == b'abc'
+    buffer.write(b'defgh')
+    assert buffer.read(2) == b'de'
+    assert buffer.read(2) == b'fg'
+    assert buffer.read(2) == b'h'
+
+
+def test_ring_buffer_close_wakes_producer():
+    buffer = RingBuffer(4)
+    results = []
+    producer = Thread(target=lambda: results.append(buffer.write(b'abcdefgh')), daemon=True)
+    producer.start()
+    assert wait_for(lambda: len(buffer) == 4)
+    time.sleep(0.01)
+    assert producer.is_alive()
+    buffer.close()
+    producer.join(2)
+    assert not producer.is_alive()
+    assert results == [False]
+
+
+def test_ring_buffer_read_wakes_producer():
+    buffer = RingBuffer(4)
+    producer = Thread(target=buffer.write, args=(b'abcdef',), daemon=True)
+    producer.start()
+    assert wait_for(lambda: len(buffer) == 4)
+    assert buffer.read(4) == b'abcd'
+    producer.join(2)
+    assert buffer.read(4) == b'ef'
+
+
+def commit_frames(ring, *indexes):
+    for index in indexes:
+        position = ring.acquire()
+        ring.buffers[position][...] = index
+        ring.commit(position, index)
+
+
+def test_frame_ring_wraparound():
+    ring = FrameRing(3, (1, 1, 1))
+    commit_frames(ring, 0, 1)
+    assert ring.peek(0)[0] == 0
+    ring.release()
+    commit_frames(ring, 2, 3)
+    assert len(ring) == 3
+    assert [ring.peek(offset)[0] for offset in range(3)] == [1, 2, 3]
+    assert [int(ring.peek(offset)[1][0, 0, 0]) for offset in range(3)] == [1, 2, 3]
+    assert ring.peek(3) is None
+    ring.release(10)
+    assert len(ring) == 0
+    assert ring.peek() is None
+
+
+def test_frame_ring_close_wakes_producer():
+    ring = FrameRing(2, (1, 1, 1))
+    commit_frames(ring, 0, 1)
+    results = []
+    producer = Thread(target=lambda: results.append(ring.acquire()), daemon=True)
+    producer.start()
+    time.sleep(0.01)
+    assert producer.is_alive()
+    ring.close()
+    producer.join(2)
+    assert results == [None]
+
+
+class FakeFrames():
+    """Frames of a video made of constant pixels, the value of the pixels is
+    the index of the frame.
+    """
+
+    def __init__(self, count=100):
+        self.count = count
+        self.read_frames = []
+        self.skipped_frames = []
+
+    def read(self, frame, buffer):
+        if frame >= self.count:
+            return False, None
+        self.read_frames.append(frame)
+        buffer[...] = frame
+        return True, buffer
+
+    def skip(self, frame, buffer):
+        if frame >= self.count:
+            return False
+        self.skipped_frames.append(frame)
+        return True
+
+
+def test_decoder_stop_with_full_ring():
+    frames = FakeFrames()
+    decoder = FrameDecoder(frames.read, frames.skip, 0.1, lambda data: data, cv2.INTER_LINEAR,
+                           lambda: 0, count=2)
+    decoder.start(0, (4, 2))
+    assert wait_for(lambda: len(decoder.ring) == 2)
+    stopper = Thread(target=decoder.stop, daemon=True)
+    stopper.start()
+    stopper.join(2)
+    assert not stopper.is_alive()
+    assert not decoder.is_running()
+    assert frames.read_frames == [0, 1]
+
+
+def test_decoder_skips_late_frames():
+    frames = FakeFrames(count=5)
+    decoder = FrameDecoder(frames.read, frames.skip, 0.1, lambda data: 255 - data, cv2.INTER_LINEAR,
+                           lambda: 0.25, count=4)
+    decoder.start(0, (4, 2))
+    assert wait_for(lambda: decoder.finished)
+    # Frames 0 and 1 end before the position of the clock
+    assert frames.skipped_frames == [0, 1]
+    assert decoder.dropped == 2
+    assert [decoder.ring.peek(offset)[0] for offset in range(len(decoder.ring))] == [2, 3, 4]
+    index, data = decoder.ring.peek()
+    assert data.shape == (2, 4, 3)
+    assert (data == 255 - 2).all()
+    decoder.stop()
+
+
+def test_decoder_resizes_frames():
+    def read(frame, buffer):
+        return frame < 1, np.full((4, 8, 3), 10, dtype=np.uint8)
+
+    decoder = FrameDecoder(read, lambda frame, buffer: True, 0.1, lambda data: data, cv2.INTER_LINEAR,
+                           lambda: 0, count=2)
+    decoder.start(0, (4, 2))
+    assert wait_for(lambda: decoder.finished)
+    index, data = decoder.ring.peek()
+    assert index == 0 and data.shape == (2, 4, 3) and (data == 10).all()
+    decoder.stop()
+
+
+class FakeDecoder():
+
+    def __init__(self):
+        self.ring = FrameRing(4, (1, 1, 3))
+        self.dropped = 3
+
+
+def make_video(clock):
+    # Only the attributes used to choose the displayed frame
+    video = Video.__new__(Video)
+    video.frame_delay = 0.1
+    video.get_pos = clock
+    video._decoder = FakeDecoder()
+    video._holding = False
+    video._dropped = 0
+    video._presented = 0
+    video._late = 0
+    return video
+
+
+def test_next_frame():
+    position = [0]
+    video = make_video(lambda: position[0])
+    ring = video._decoder.ring
+    commit_frames(ring, 0, 1, 2, 3)
+
+    # Frame 0 is displayed from the start of the video
+    assert video._next_frame() is None
+    position[0] = 0.05
+    assert video._next_frame()[0] == 0
+    # The displayed frame is kept in the ring
+    assert len(ring) == 4
+    assert video._next_frame() is None
+
+    # Frame 1 is replaced by frame 2 before being displayed
+    position[0] = 0.25
+    assert video._next_frame()[0] == 2
+    assert [ring.peek(offset)[0] for offset in range(len(ring))] == [2, 3]
+    assert video.get_stats() == {'presented': 2, 'dropped': 1 + 3, 'late': 0}
+
+    # Frame 3 is displayed after the time of frame 4
+    position[0] = 0.45
+    assert video._next_frame()[0] == 3
+    assert len(ring) == 1
+    assert video.get_stats() == {'presented': 3, 'dropped': 1 + 3, 'late': 1}
+    assert video.get_dropped_frames() == 4
+
+    # Nothing new is decoded
+    position[0] = 0.6
+    assert video._next_frame() is None
+    assert len(ring) == 1
+
+
+def make_frame(width, height):
+    # Each pixel has its own color, in BGR order as decoded
+    data = np.empty((height, width, 3), dtype=np.uint8)
+    data[..., 0] = np.arange(width, dtype=np.uint8)[None, :]
+    data[..., 1] = np.arange(height, dtype=np.uint8)[:, None] * 3
+    data[..., 2] = 200
+    return data
+
+
+def check_pixels(surface, data):
+    height, width = data.shape[:2]
+    for x, y in [(0, 0), (width - 1, 0), (0, height - 1), (width - 1, height - 1), (width // 2, height // 3)]:
+        b, g, r = data[y, x]
+        assert tuple(surface.get_at((x, y)))[:3] == (r, g, b)
+
+
+def test_frame_sink_steady_playback():
+    pygame.display.init()
+    pygame.display.set_mode((64, 48), 0, 32)
+    sink = FrameSink()
+    first = sink.write(make_frame(30, 20))
+    # Pixels written with OpenCV in the buffer of the surface
+    assert FrameSink._get_conversion(first) is not None
+    for index in range(10):
+        data = make_frame(30, 20)
+        data[..., 2] = index
+        surface = sink.write(data)
+        assert surface is first
+        check_pixels(surface, data)
+    assert sink.get_stats() == {'frames': 11, 'allocations': 1,
+                                'allocated_bytes': first.get_pitch() * 20}
+
+    # A new size allocates a new surface once
+    for _ in range(3):
+        surface = sink.write(make_frame(16, 8))
+        check_pixels(surface, make_frame(16, 8))
+    assert surface is not first
+    assert sink.get_stats()['allocations'] == 2
+    assert sink.write(make_frame(30, 20)) is first
+    assert sink.get_stats()['allocations'] == 2
+
+
+def test_frame_sink_surfarray_fallback(monkeypatch):
+    pygame.display.init()
+    pygame.display.set_mode((64, 48), 0, 32)
+    monkeypatch.setattr(FrameSink, '_get_conversion', staticmethod(lambda surface: None))
+    sink = FrameSink()
+    for index in range(5):
+        data = make_frame(30, 20)
+        data[..., 2] = index * 10
+        surface = sink.write(data)
+        check_pixels(surface, data)
+    assert sink.get_stats()['allocations'] == 1
+
+
+class FakeAudio():
+
+    def __init__(self):
+        self.position = 0
+
+    def get_busy(self):
+        return True
+
+    def get_pos(self):
+        return self.position
+
+
+class FakeStream():
+    missing_ffmpeg = False
+
+
+class RunningDecoder():
+    finished = False
+
+    def __init__(self, size):
+        self.ring = FrameRing(4, (size[1], size[0], 3))
+        self.dropped = 0
+
+    def is_running(self):
+        return True
+
+
+def make_player(size):
+    # Video playing from the main loop, the frames are already decoded
+    video = VideoPygame.__new__(VideoPygame)
+    video._sink = FrameSink()
+    video._loop = False
+    video.ended = False
+    video.active = True
+    video.paused = False
+    video.buffering = False
+    video.subs = None
+    video.frame = 0
+    video.frame_delay = 0.1
+    video.frame_data = None
+    video.frame_surf = None
+    video.speed = 1
+    video.current_size = size
+    video._starting_time = 0
+    video._audio = FakeAudio()
+    video._missing_ffmpeg = False
+    video._stream = video._frames = FakeStream()
+    video._decoder = RunningDecoder(size)
+    video._holding = False
+    video._dropped = video._presented = video._late = 0
+    return video
+
+
+def test_video_update_only_draws_new_frames():
+    pygame.display.init()
+    screen = pygame.display.set_mode((40, 30), 0, 32)
+    video = make_player((40, 30))
+    commit_frames(video._decoder.ring, 0, 1)
+    video._decoder.ring.buffers[0][...] = (10, 20, 30)
+    video._decoder.ring.buffers[1][...] = (40, 50, 60)
+
+    video._audio.position = 0.05
+    assert video.update(screen)
+    assert tuple(screen.get_at((5, 5)))[:3] == (30, 20, 10)
+
+    # Frame 1 is not due yet, the screen is left untouched
+    screen.fill((0, 0, 0))
+    video._audio.position = 0.07
+    assert not video.update(screen)
+    assert tuple(screen.get_at((5, 5)))[:3] == (0, 0, 0)
+    # The frame is drawn again if asked to
+    assert video.update(screen, force_draw=True)
+    assert tuple(screen.get_at((5, 5)))[:3] == (30, 20, 10)
+
+    video._audio.position = 0.15
+    assert video.update(screen)
+    assert tuple(screen.get_at((5, 5)))[:3] == (60, 50, 40)
+    assert video.get_stats() == {'presented': 2, 'dropped': 0, 'late': 0}
+
+
+def test_video_next_frame_time():
+    video = make_player((40, 30))
+    commit_frames(video._decoder.ring, 0, 1)
+    video._audio.position = 0.05
+    video._update()
+    # Frame 1 is displayed at 0.1 s
+    video._audio.position = 0.07
+    now = time.time()
+    assert now + 0.03 <= video.get_next_frame_time() <= time.time() + 0.03 + 1e-6
+    # Already late
+    video._audio.position = 0.12
+    assert now <= video.get_next_frame_time() <= time.time() + 1e-6
+    video.paused = True
+    assert video.get_next_frame_time() is None
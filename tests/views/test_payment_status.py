@@ -0,0 +1,43 @@
+import os.path as osp
+import tempfile
+import pytest
+from piticket import language
+from piticket.views import PiWindow
+from piticket.views import box as box_module
+
+language.init(osp.join(tempfile.mkdtemp(), 'translations.cfg'), True)
+win = PiWindow('test', size=(1280, 1000))
+
+
+class FakeTime():
+
+    def __init__(self):
+        self.now = 1700000000.2
+
+    def time(self):
+        return self.now
+
+
+@pytest.mark.parametrize('successful', [True, False])
+def test_payment_status_painted_once(monkeypatch, successful):
+    clock = FakeTime()
+    monkeypatch.setattr(box_module, 'time', clock)
+    win.backgrounds.invalidate()
+    win.show_payment_status(successful)
+    assert win.update_display()
+    header_clock = win.current_background._header.date
+
+    # Called at each frame of the state, nothing changes within a second
+    for _ in range(5):
+        clock.now += 0.1
+        win.show_payment_status(successful)
+        assert win.update_display() == []
+    # The loop wakes up when the displayed time changes
+    assert win.get_next_update() == 1700000001
+
+    # Only the clock of the header is painted again
+    clock.now = 1700000001.05
+    win.show_payment_status(successful)
+    areas = win.update_display()
+    assert areas and all(header_clock.rect.contains(area) for area in areas)
+    assert win.get_next_update() == 1700000002
@@ -0,0 +1,41 @@
+import os.path as osp
+import tempfile
+import pytest
+from piticket import language
+from piticket.views import PiWindow
+
+ticket = {'name': '', 'departure_station': 'Lagos', 'destination': 'Kaduna', 'date': '18/10/26',
+          'departure_time': '10:18', 'arrival_time': '12:18', 'train': '', 'carriage': '',
+          'platform': '', 'seat': '', 'route': 'ANY PERMITTED', 'price': '20000', 'currency': 'NGN',
+          'railcard': '25-30', 'class': 'Economy', 'ticket_type': 'Standard off-peak day return',
+          'passengers': {'adult(s)': '1', 'children (5-15)': '0'}}
+tickets = {('Kaduna', '20000', 'Standard off-peak day return'): ticket}
+
+# Arguments of the backgrounds, except the screen surface
+ARGUMENTS = {'choose': (tickets,), 'chosen': (ticket,)}
+
+language.init(osp.join(tempfile.mkdtemp(), 'translations.cfg'), True)
+win = PiWindow('test', size=(1280, 1000))
+
+
+def get_rects(bkgd):
+    return [tuple(box.rect) for box in bkgd.get_widgets()]
+
+
+@pytest.mark.parametrize('name', [name for name in PiWindow.FACTORIES if name != 'pay'])
+@pytest.mark.parametrize('size', [(1600, 1100), (1440, 1080)])
+def test_resized_background_same_as_built(name, size):
+    factory = PiWindow.FACTORIES[name]
+    args = ARGUMENTS.get(name, ())
+    win.resize((1280, 1000))
+    kept = win.backgrounds.get(name, factory, *args, win.surface)
+    kept.resize(win.surface)
+
+    win.resize(size)
+    bkgd = win.backgrounds.get(name, factory, *args, win.surface)
+    bkgd.resize(win.surface)
+    if factory.RELAYOUT:
+        assert bkgd is kept
+    else:
+        assert bkgd is not kept
+    assert get_rects(bkgd) == get_rects(factory(*args, win.surface))
@@ -0,0 +1,113 @@
+import pygame
+from piticket.views import row as row_module
+from piticket.views.row import RowView
+
+pygame.init()
+win = pygame.display.set_mode((800, 600))
+
+entries = {i: {'destination': f'City {i}', 'price': str(1000 * i), 'currency': 'NGN',
+               'ticket_type': 'Standard single'} for i in range(20)}
+
+
+class FakeTime():
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def make_view(rows=entries):
+    return RowView(parent=win, x=0, y=0, width=400, height=500,
+                   position=None, margin=30, padding=20, border=2, border_radius=0,
+                   border_color=(0, 0, 0), content=None, content_color=(0, 0, 0),
+                   content_position='top-left', color=(255, 255, 255), rows=rows)
+
+
+def displayed_entries(view):
+    rows = sorted((row for row in view.rows if row.content is not None), key=lambda row: row.rect.y)
+    return [row.content['destination'] for row in rows]
+
+
+def test_rows_recycled_when_scrolling():
+    view = make_view()
+    rows = list(view.rows)
+    # One more row than the visible ones
+    assert len(rows) == view.offset + 1
+    assert displayed_entries(view) == [f'City {i}' for i in range(6)]
+
+    view.scroll_to(view.row_height * 7)
+    assert view.rows == rows
+    assert view.start == 7
+    assert displayed_entries(view) == [f'City {i}' for i in range(7, 13)]
+    for row_box, row in zip(view.row_boxes, view.rows):
+        index = int(row.content['destination'].split()[1])
+        assert row_box.rect.y == view.rect.y + (index - 7) * view.row_height
+
+    # A row keeps its entry while it is visible
+    row = [row for row in view.rows if row.content['destination'] == 'City 9'][0]
+    view.scroll_to(view.row_height * 8.5)
+    assert row.content['destination'] == 'City 9'
+    assert displayed_entries(view) == [f'City {i}' for i in range(8, 14)]
+
+
+def test_few_entries():
+    view = make_view({i: entries[i] for i in range(3)})
+    assert len(view.rows) == 3
+    assert view.get_max_scroll() == 0
+    assert not view.scroll_to(100)
+    assert displayed_entries(view) == ['City 0', 'City 1', 'City 2']
+
+
+def test_page_clamping():
+    view = make_view()
+    view.previous_page()
+    assert view.scroll == 0 and view.start == 0
+    view.next_page()
+    assert view.start == 5
+    view.show_page(-3)
+    assert view.scroll == 0 and view.start == 0
+    view.show_page(100)
+    assert view.scroll == view.get_max_scroll()
+    assert displayed_entries(view)[-1] == 'City 19'
+    scroll = view.scroll
+    view.next_page()
+    assert view.scroll == scroll
+    view.previous_page()
+    assert view.scroll < scroll
+
+
+def test_kinetic_scroll_settles(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(row_module, 'time', clock)
+    view = make_view()
+    view._velocity = 800
+    view._last_step = clock.now
+    assert view.next_update() == clock.now
+    for _ in range(100):
+        clock.now += 0.02
+        view.refresh()
+        if not view._velocity:
+            break
+    assert view._velocity == 0
+    assert view.next_update() is None
+    assert 0 < view.scroll < view.get_max_scroll()
+    # Nothing moves anymore
+    scroll = view.scroll
+    clock.now += 1
+    view.refresh()
+    assert view.scroll == scroll
+
+
+def test_kinetic_scroll_stops_at_the_end(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(row_module, 'time', clock)
+    view = make_view()
+    view._velocity = -5000
+    view._last_step = clock.now
+    clock.now += 0.02
+    view.refresh()
+    # Already at the top, the list does not move
+    assert view._velocity == 0
+    assert view.scroll == 0